@@ -0,0 +1,173 @@
+from datetime import date
+from typing import Optional
+from app.dates import day_start
+
+
+def date_range_filter(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Build a Mongo filter for the attendance `date` field (BSON dates)"""
+    date_filter = {}
+    if start_date:
+        date_filter["$gte"] = day_start(start_date)
+    if end_date:
+        date_filter["$lte"] = day_start(end_date)
+    return date_filter
+
+
+def day_key_range_filter(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Build a Mongo filter for a rollup `date` key (YYYY-MM-DD strings)"""
+    date_filter = {}
+    if start_date:
+        date_filter["$gte"] = start_date.isoformat()
+    if end_date:
+        date_filter["$lte"] = end_date.isoformat()
+    return date_filter
+
+
+# Rollup month key (YYYY-MM) of an attendance record
+MONTH_KEY = {"$dateToString": {"format": "%Y-%m", "date": "$date"}}
+# Rollup day key (YYYY-MM-DD) of an attendance record
+DAY_KEY = {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}
+
+
+def attendance_summary_pipeline(
+    employee_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """Aggregation pipeline counting an employee's attendance per month and status
+
+    Only one small document per (month, status) pair leaves the database, so
+    the cost in the API process does not grow with the employee's history.
+    """
+    match = {"employee_id": employee_id}
+    date_filter = date_range_filter(start_date, end_date)
+    if date_filter:
+        match["date"] = date_filter
+
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {
+                    "month": MONTH_KEY,
+                    "status": "$status",
+                },
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"_id.month": 1}},
+    ]
+
+
+# Report bucket -> expression computing the bucket label from a rollup day key
+REPORT_BUCKETS = {
+    "month": {"$substrCP": ["$date", 0, 7]},
+    # Monday of the ISO week; $dateTrunc needs MongoDB 5.0+
+    "week": {
+        "$dateToString": {
+            "format": "%Y-%m-%d",
+            "date": {
+                "$dateTrunc": {
+                    "date": {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d"}},
+                    "unit": "week",
+                    "startOfWeek": "monday",
+                }
+            },
+        }
+    },
+}
+
+
+def department_report_pipeline(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: Optional[str] = None,
+    department: Optional[str] = None,
+):
+    """Aggregation pipeline over the daily department rollups
+
+    Groups present/absent counts per department and optional week/month
+    bucket. The input is one document per (date, department), so the cost
+    depends on the length of the range, not on the number of employees.
+    """
+    match = {}
+    date_filter = day_key_range_filter(start_date, end_date)
+    if date_filter:
+        match["date"] = date_filter
+    if department:
+        match["department"] = department
+
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {
+                    "department": "$department",
+                    "period": REPORT_BUCKETS[bucket] if bucket else None,
+                },
+                "present": {"$sum": "$present"},
+                "absent": {"$sum": "$absent"},
+            }
+        },
+        {"$match": {"$or": [{"present": {"$ne": 0}}, {"absent": {"$ne": 0}}]}},
+        {"$sort": {"_id.department": 1, "_id.period": 1}},
+        {"$project": {"_id": 0, "department": "$_id.department", "period": "$_id.period", "present": 1, "absent": 1}},
+    ]
+
+
+def summarize_counts(present_count: int, absent_count: int):
+    """Build the summary counters shared by all attendance summaries"""
+    total_records = present_count + absent_count
+    return {
+        "total_records": total_records,
+        "present_days": present_count,
+        "absent_days": absent_count,
+        "attendance_percentage": round((present_count / total_records * 100), 2) if total_records > 0 else 0,
+    }
+
+
+def build_attendance_summary(employee_id: str, groups: list):
+    """Fold (month, status) aggregation groups into the summary response"""
+    months = {}
+    for group in groups:
+        month = group["_id"]["month"]
+        status = group["_id"]["status"]
+        counts = months.setdefault(month, {"Present": 0, "Absent": 0})
+        counts[status] = counts.get(status, 0) + group["count"]
+
+    present_count = sum(counts["Present"] for counts in months.values())
+    absent_count = sum(counts["Absent"] for counts in months.values())
+
+    return {
+        "employee_id": employee_id,
+        **summarize_counts(present_count, absent_count),
+        "monthly": [
+            {"month": month, **summarize_counts(counts["Present"], counts["Absent"])}
+            for month, counts in sorted(months.items())
+        ],
+    }
+
+
+def build_department_report(groups: list):
+    """Fold (department, period) count groups into per-department reports"""
+    departments = {}
+    for group in groups:
+        report = departments.setdefault(
+            group["department"], {"present": 0, "absent": 0, "periods": []}
+        )
+        report["present"] += group["present"]
+        report["absent"] += group["absent"]
+        if group["period"] is not None:
+            report["periods"].append({
+                "period": group["period"],
+                **summarize_counts(group["present"], group["absent"]),
+            })
+
+    return [
+        {
+            "department": department,
+            **summarize_counts(report["present"], report["absent"]),
+            "periods": report["periods"],
+        }
+        for department, report in sorted(departments.items())
+    ]
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from app.database import ACTIVE_EMPLOYEE_FILTER, get_employees_collection
+from app.search import SEARCH_FIELD
+
+load_dotenv()
+
+EMPLOYEE_CACHE_SIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "10000"))
+EMPLOYEE_CACHE_TTL_SECONDS = float(os.getenv("EMPLOYEE_CACHE_TTL_SECONDS", "60"))
+
+# Cached employees leave out their search keys, which are never returned
+LOOKUP_PROJECTION = {SEARCH_FIELD: 0}
+
+
+class EmployeeCache:
+    """Bounded LRU cache of employee documents with a time-to-live
+
+    Entries are keyed by `employee_id` with a secondary index on the Mongo
+    `_id`. The cache is per process: writes in this process invalidate it
+    immediately, writes from other workers are picked up once the TTL expires.
+
+    Lookups that miss read the database and then cache the result. Take
+    `epoch()` before the read and pass it to `set()`: if an invalidation ran
+    in the meantime the document may predate that write, so it is not cached.
+    """
+
+    def __init__(self, max_size: int = EMPLOYEE_CACHE_SIZE, ttl_seconds: float = EMPLOYEE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # employee_id -> (expires_at, document)
+        self._object_ids = {}  # str(_id) -> employee_id
+        self._epoch = 0  # incremented by every invalidation
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, employee_id: Optional[str]) -> Optional[dict]:
+        """The live cached employee, without counting a hit or miss"""
+        entry = self._entries.get(employee_id)
+        if entry is None:
+            return None
+        expires_at, employee = entry
+        if expires_at < time.monotonic():
+            self._drop(employee_id)
+            return None
+        self._entries.move_to_end(employee_id)
+        return employee
+
+    def _count(self, employee: Optional[dict]) -> Optional[dict]:
+        if employee is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return employee
+
+    def get(self, employee_id: str) -> Optional[dict]:
+        """Return the cached employee, or None on a miss"""
+        return self._count(self._lookup(employee_id))
+
+    def get_mixed(self, value: str) -> Optional[dict]:
+        """Return the cached employee for an `_id` or `employee_id` value
+
+        Like the uncached lookups, an `_id` match wins; counts one hit or miss.
+        """
+        employee = self._lookup(self._object_ids.get(value)) if ObjectId.is_valid(value) else None
+        return self._count(employee or self._lookup(value))
+
+    def epoch(self) -> int:
+        """Invalidation counter to take before reading an employee to cache"""
+        return self._epoch
+
+    def set(self, employee: dict, epoch: Optional[int] = None):
+        """Cache an employee document read at `epoch`"""
+        if self.max_size <= 0:
+            return
+        if epoch is not None and epoch != self._epoch:
+            # Invalidated while it was being read; it may be stale
+            return
+        employee_id = employee["employee_id"]
+        self._drop(employee_id)
+        self._entries[employee_id] = (time.monotonic() + self.ttl_seconds, employee)
+        self._object_ids[str(employee["_id"])] = employee_id
+        while len(self._entries) > self.max_size:
+            evicted_id, (_, evicted) = self._entries.popitem(last=False)
+            self._object_ids.pop(str(evicted["_id"]), None)
+
+    def _drop(self, employee_id: str):
+        entry = self._entries.pop(employee_id, None)
+        if entry is not None:
+            self._object_ids.pop(str(entry[1]["_id"]), None)
+
+    def invalidate(self, employee_id: str):
+        """Drop an employee from the cache after it was written"""
+        self._epoch += 1
+        self._drop(employee_id)
+
+    def clear(self):
+        """Drop every cached employee"""
+        self._epoch += 1
+        self._entries.clear()
+        self._object_ids.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+
+employee_cache = EmployeeCache()
+
+
+async def find_employee(employee_id: str) -> Optional[dict]:
+    """Look up an employee by `employee_id`, using the cache when possible"""
+    employee = employee_cache.get(employee_id)
+    if employee is None:
+        epoch = employee_cache.epoch()
+        employee = await get_employees_collection().find_one({"employee_id": employee_id, **ACTIVE_EMPLOYEE_FILTER}, LOOKUP_PROJECTION)
+        if employee is not None:
+            employee_cache.set(employee, epoch)
+    return employee
+
+
+async def find_employees(values: list) -> dict:
+    """Resolve mixed `_id`/`employee_id` values to employees in bulk
+
+    Like `GET /employees/{id}`, a value that is a valid ObjectId is tried as
+    a Mongo `_id` first and then as an `employee_id`. Cache misses are
+    resolved with at most one `$in` query per key type, run concurrently.
+    Returns a mapping of value -> employee for the values that were found.
+    """
+    found = {}
+    object_ids = []
+    employee_ids = []
+    for value in dict.fromkeys(values):
+        employee = employee_cache.get_mixed(value)
+        if employee is not None:
+            found[value] = employee
+            continue
+        if ObjectId.is_valid(value):
+            object_ids.append(ObjectId(value))
+        employee_ids.append(value)
+
+    epoch = employee_cache.epoch()
+    employees = get_employees_collection()
+    queries = []
+    if object_ids:
+        queries.append(employees.find({"_id": {"$in": object_ids}, **ACTIVE_EMPLOYEE_FILTER}, LOOKUP_PROJECTION).to_list())
+    if employee_ids:
+        queries.append(employees.find({"employee_id": {"$in": employee_ids}, **ACTIVE_EMPLOYEE_FILTER}, LOOKUP_PROJECTION).to_list())
+    by_object_id = {}
+    by_employee_id = {}
+    for documents in await asyncio.gather(*queries):
+        for employee in documents:
+            employee_cache.set(employee, epoch)
+            by_object_id[str(employee["_id"])] = employee
+            by_employee_id[employee["employee_id"]] = employee
+
+    for value in employee_ids:
+        employee = by_object_id.get(value) or by_employee_id.get(value)
+        if employee is not None:
+            found[value] = employee
+    return found
@@ -1,53 +1,149 @@
+import asyncio
 import os
-from pymongo import MongoClient
+import re
+from typing import Optional
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.asynchronous.collection import AsyncCollection
 from dotenv import load_dotenv
+from app.metrics import CommandMetrics, pool_metrics
 
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "hrms_lite")
 
-# Create MongoDB client with connection pooling and lazy connection
-client = MongoClient(
-    MONGODB_URL,
-    serverSelectionTimeoutMS=2000,
-    connectTimeoutMS=5000,
-    serverMonitoringMode="auto",
-)
+# Connection pool settings
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "2000"))
 
-# Get database reference (connection is lazy - will be established on first operation)
-database = client[DATABASE_NAME]
+# Production launches build indexes once before forking workers
+CREATE_INDEXES_ON_STARTUP = os.getenv("CREATE_INDEXES_ON_STARTUP", "true").lower() == "true"
 
-# Collections
-employees_collection = database["employees"]
-attendance_collection = database["attendance"]
+# Write operations per bulk write during a backfill
+BACKFILL_BATCH_SIZE = 1000
 
+# MongoDB server error code for unique index violations
+DUPLICATE_KEY_ERROR = 11000
 
-def get_database():
+# Matches employees that have not been tombstoned for deletion
+ACTIVE_EMPLOYEE_FILTER = {"deleted_at": None}
+
+# The async client is created by the FastAPI lifespan hook (see app/main.py),
+# not at import time, so it is always bound to the running event loop.
+client: Optional[AsyncMongoClient] = None
+database: Optional[AsyncDatabase] = None
+
+
+async def connect_to_mongo():
+    """Create the async MongoDB client and its connection pool"""
+    global client, database
+
+    if client is not None:
+        return
+
+    # Connection is lazy - it will be established on first operation
+    client = AsyncMongoClient(
+        MONGODB_URL,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=5000,
+        serverMonitoringMode="auto",
+        event_listeners=[CommandMetrics(), pool_metrics],
+    )
+    database = client[DATABASE_NAME]
+
+
+async def close_mongo_connection():
+    """Close the MongoDB client and release pooled connections"""
+    global client, database
+
+    if client is not None:
+        await client.close()
+    client = None
+    database = None
+
+
+def get_database() -> AsyncDatabase:
     """Get database connection"""
+    if database is None:
+        raise RuntimeError(
+            "MongoDB client is not initialised; call connect_to_mongo() first"
+        )
     return database
 
 
-def get_employees_collection():
+def get_employees_collection() -> AsyncCollection:
     """Get employees collection"""
-    return employees_collection
+    return get_database()["employees"]
 
 
-def get_attendance_collection():
+def get_attendance_collection() -> AsyncCollection:
     """Get attendance collection"""
-    return attendance_collection
-
-
-# Create indexes for better performance
-def create_indexes():
-    """Create database indexes"""
-    try:
-        # Unique index on employee_id
-        employees_collection.create_index("employee_id", unique=True)
-        # Index on email for faster lookups
-        employees_collection.create_index("email")
-        # Compound index for attendance lookups
-        attendance_collection.create_index([("employee_id", 1), ("date", 1)])
-        print("✓ Database indexes created successfully")
-    except Exception as e:
-        print(f"⚠ Note: {e}")
+    return get_database()["attendance"]
+
+
+def get_monthly_rollups_collection() -> AsyncCollection:
+    """Get per-employee monthly attendance rollups collection"""
+    return get_database()["attendance_monthly_rollups"]
+
+
+def get_daily_rollups_collection() -> AsyncCollection:
+    """Get per-department daily attendance rollups collection"""
+    return get_database()["attendance_daily_rollups"]
+
+
+def get_attendance_totals_collection() -> AsyncCollection:
+    """Get attendance totals collection"""
+    return get_database()["attendance_totals"]
+
+
+def get_jobs_collection() -> AsyncCollection:
+    """Get background jobs collection"""
+    return get_database()["jobs"]
+
+
+async def bulk_write_batches(collection: AsyncCollection, operations) -> int:
+    """Apply an async iterable of write operations in unordered batches
+
+    Returns the number of documents modified.
+    """
+    modified = 0
+    batch = []
+    async for operation in operations:
+        batch.append(operation)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            result = await collection.bulk_write(batch, ordered=False)
+            modified += result.modified_count
+            batch = []
+    if batch:
+        result = await collection.bulk_write(batch, ordered=False)
+        modified += result.modified_count
+    return modified
+
+
+def run_with_mongo(command, *args):
+    """Run a command-line coroutine function with a MongoDB connection open"""
+    async def run():
+        await connect_to_mongo()
+        try:
+            await command(*args)
+        finally:
+            await close_mongo_connection()
+
+    asyncio.run(run())
+
+
+def duplicate_key_field(details: Optional[dict]) -> Optional[str]:
+    """Name the leading field of the unique index a duplicate-key error hit"""
+    details = details or {}
+    key_pattern = details.get("keyPattern")
+    if key_pattern:
+        return next(iter(key_pattern))
+    # Older servers only report the index name, e.g. "index: email_1 dup key"
+    match = re.search(r"index: ([\w.]+?)_-?1(?=_|\s|$)", details.get("errmsg", ""))
+    return match.group(1) if match else None
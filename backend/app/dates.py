@@ -0,0 +1,134 @@
+"""
+Native date storage
+
+Attendance days are stored as BSON dates at midnight UTC and timestamps
+(``created_at``, ``updated_at``, ``deleted_at``) as BSON dates, which are
+smaller than ISO strings, compare as dates in range queries and work with
+the date aggregation operators. Responses still carry ISO strings (see
+app/serialization.py). Rollup keys (``date``, ``month``) stay ISO strings.
+
+Convert documents written before native dates (online, in batches):
+    python -m app.dates
+"""
+
+from datetime import date, datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.database import (
+    get_attendance_collection,
+    get_employees_collection,
+    run_with_mongo,
+)
+
+# Date fields converted by the migration, per collection
+DATE_FIELDS = {
+    "attendance": ("date", "created_at"),
+    "employees": ("created_at", "updated_at", "deleted_at"),
+}
+# Documents read and rewritten per round trip during the migration
+MIGRATION_BATCH_SIZE = 1000
+
+
+def day_start(day: date) -> datetime:
+    """Stored form of an attendance day: midnight UTC"""
+    return datetime(day.year, day.month, day.day)
+
+
+def utcnow() -> datetime:
+    """Current UTC time at the millisecond precision BSON dates keep"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def iso_day(value) -> str:
+    """YYYY-MM-DD for a stored day (legacy string days pass through)"""
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def iso_timestamp(value) -> str:
+    """ISO 8601 for a stored timestamp (legacy strings pass through)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _migrate_collection(collection, fields: tuple) -> tuple[int, int]:
+    """Convert one collection's string date fields, returning (converted, failed)"""
+    legacy_filter = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    converted = 0
+    failed = 0
+    last_id = None
+    while True:
+        # Keyset over _id so documents that cannot be converted are not revisited
+        query = legacy_filter if last_id is None else {"$and": [legacy_filter, {"_id": {"$gt": last_id}}]}
+        documents = await (
+            collection.find(query, {field: 1 for field in fields})
+            .sort("_id", 1)
+            .limit(MIGRATION_BATCH_SIZE)
+            .to_list()
+        )
+        if not documents:
+            break
+        last_id = documents[-1]["_id"]
+
+        operations = []
+        operation_ids = []
+        for document in documents:
+            update = {}
+            for field in fields:
+                value = document.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    update[field] = datetime.fromisoformat(value)
+                except ValueError:
+                    print(f"⚠ {collection.name} {document['_id']}: cannot parse {field} {value!r}")
+                    failed += 1
+            if update:
+                # Matching the old values leaves documents rewritten meanwhile alone
+                operations.append(UpdateOne(
+                    {"_id": document["_id"], **{field: document[field] for field in update}},
+                    {"$set": update},
+                ))
+                operation_ids.append(document["_id"])
+        if not operations:
+            continue
+
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+        except BulkWriteError as exc:
+            # e.g. a record marked again with a native date before its
+            # string-dated twin was converted (unique employee_id + date)
+            converted += exc.details.get("nModified", 0)
+            for error in exc.details.get("writeErrors", []):
+                print(f"⚠ {collection.name} {operation_ids[error['index']]}: {error.get('errmsg')}")
+                failed += 1
+    return converted, failed
+
+
+async def migrate_dates():
+    """Convert ISO string dates to BSON dates in every collection that has them"""
+    collections = {
+        "attendance": get_attendance_collection(),
+        "employees": get_employees_collection(),
+    }
+    report = {}
+    for name, fields in DATE_FIELDS.items():
+        report[name] = await _migrate_collection(collections[name], fields)
+    return report
+
+
+async def main():
+    print("Converting string dates to native dates...")
+    report = await migrate_dates()
+    for name, (converted, failed) in report.items():
+        print(f"✓ {name}: {converted} document(s) converted")
+        if failed:
+            print(f"⚠ {name}: {failed} value(s) left as strings")
+
+
+if __name__ == "__main__":
+    run_with_mongo(main)
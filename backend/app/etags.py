@@ -0,0 +1,90 @@
+"""
+Weak ETags for read endpoints
+
+Each collection has an in-process change version that the mutating handlers
+(and background jobs) bump. A read endpoint derives its ETag from the
+versions of the collections it reads, so an unchanged poll is answered with
+304 before any query runs.
+
+Versions are per process: writes in this process change the ETag
+immediately, writes from other workers are picked up once the current
+ETAG_MAX_AGE_SECONDS window ends, like the employee cache TTL. With
+EVENT_SOURCE=change_stream every worker bumps its versions for every write
+(see app/events.py), so ETags follow other workers' writes at once.
+"""
+
+import os
+import secrets
+import time
+from collections import defaultdict
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import Request, Response, status
+
+load_dotenv()
+
+# Longest time a 304 may hide a write made by another worker; 0 disables
+# the window, which is only safe with one worker or EVENT_SOURCE=change_stream
+ETAG_MAX_AGE_SECONDS = float(os.getenv("ETAG_MAX_AGE_SECONDS", "5"))
+# Cache-Control max-age for read endpoints; 0 makes clients revalidate each time
+READ_CACHE_MAX_AGE_SECONDS = int(os.getenv("READ_CACHE_MAX_AGE_SECONDS", "0"))
+
+
+class CollectionVersions:
+    """Per-collection change counters for this process"""
+
+    def __init__(self):
+        # Distinguishes processes and restarts, whose counters start over
+        self._token = secrets.token_hex(4)
+        self._versions = defaultdict(int)
+
+    def bump(self, *collections: str):
+        """Record a change to the given collections"""
+        for collection in collections:
+            self._versions[collection] += 1
+
+    def etag(self, *collections: str) -> str:
+        """Weak ETag for a response built from the given collections"""
+        window = int(time.time() // ETAG_MAX_AGE_SECONDS) if ETAG_MAX_AGE_SECONDS > 0 else 0
+        versions = "-".join(str(self._versions[collection]) for collection in collections)
+        return f'W/"{self._token}-{versions}-{window}"'
+
+
+collection_versions = CollectionVersions()
+
+
+def cache_headers(etag: str) -> dict:
+    """ETag and Cache-Control headers for a read response"""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={READ_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+    }
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(request: Request, *collections: str) -> tuple[str, Optional[Response]]:
+    """Compute the ETag for a read and a 304 response if the client has it
+
+    With several workers and EVENT_SOURCE=local, a worker that did not see a
+    write keeps answering 304 until the current ETAG_MAX_AGE_SECONDS window
+    ends, so clients may see data up to that old. Use
+    EVENT_SOURCE=change_stream for ETags that follow every worker's writes.
+    """
+    etag = collection_versions.etag(*collections)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return etag, None
@@ -0,0 +1,245 @@
+"""
+Live attendance and employee events
+
+Mutating handlers publish small deltas (the written document, or the id of
+a removed one) to an in-process bus; GET /attendance/stream relays them to
+browsers as Server-Sent Events so open pages update without refetching.
+
+With EVENT_SOURCE=local (default) each worker only sees its own writes.
+EVENT_SOURCE=change_stream instead feeds the bus from a MongoDB change
+stream (replica set or sharded cluster required), so every worker sees
+every write; it also invalidates the employee cache and ETag versions for
+writes made by other workers.
+"""
+
+import asyncio
+import contextvars
+import os
+import secrets
+from collections import deque
+from typing import Optional
+from dotenv import load_dotenv
+from pymongo.errors import PyMongoError
+from app.cache import employee_cache
+from app.database import get_database
+from app.etags import collection_versions
+from app.search import SEARCH_FIELD
+from app.serialization import dump_json, encode_document
+
+load_dotenv()
+
+# "local" publishes from the handlers, "change_stream" from MongoDB
+EVENT_SOURCE = os.getenv("EVENT_SOURCE", "local")
+# Events buffered per subscriber before it is told to resync
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "10000"))
+# Recent events kept to replay to reconnecting clients (Last-Event-ID)
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# Seconds between keep-alive comments on idle streams
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+# Seconds to wait before reopening a failed change stream
+CHANGE_STREAM_RETRY_SECONDS = 5
+# Reconnect delay suggested to browsers
+EVENT_RETRY_MS = 3000
+
+RESYNC = "resync"
+# First event on every stream; says whether it carries every worker's writes
+READY = "ready"
+
+
+class Subscription:
+    """One stream client's queue of encoded events"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        # Set when events were dropped; the client must refetch
+        self.overflowed = False
+
+    def reset(self):
+        """Discard queued events after an overflow"""
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBus:
+    """Fan-out of encoded events to every subscribed stream"""
+
+    def __init__(self):
+        # Distinguishes processes and restarts, whose sequence numbers start over
+        self._token = secrets.token_hex(4)
+        self._sequence = 0
+        self._history = deque(maxlen=EVENT_HISTORY_SIZE)
+        self._subscribers = set()
+
+    def publish(self, event_type: str, data: dict):
+        """Publish a handler's write, unless a change stream reports writes"""
+        if EVENT_SOURCE == "local":
+            self.dispatch(event_type, data)
+
+    def dispatch(self, event_type: str, data: dict):
+        """Encode an event once and queue it for every subscriber"""
+        self._sequence += 1
+        event = (f"{self._token}-{self._sequence}", event_type, dump_json(data))
+        self._history.append((self._sequence, event))
+        for subscription in self._subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> tuple[Subscription, bool]:
+        """Register a subscriber, replaying events after last_event_id
+
+        Returns the subscription and whether the replay was complete; when
+        it is not, the client has missed events and must refetch.
+        """
+        subscription = Subscription()
+        complete = True
+        if last_event_id:
+            missed = self._events_after(last_event_id)
+            if missed is None or len(missed) > EVENT_QUEUE_SIZE:
+                complete = False
+            else:
+                for event in missed:
+                    subscription.queue.put_nowait(event)
+        self._subscribers.add(subscription)
+        return subscription, complete
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def _events_after(self, event_id: str) -> Optional[list]:
+        """Buffered events newer than event_id, or None if it is unknown"""
+        token, _, sequence = event_id.partition("-")
+        if token != self._token or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        if sequence == self._sequence:
+            return []
+        if not self._history or self._history[0][0] > sequence + 1:
+            return None
+        return [event for number, event in self._history if number > sequence]
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "published": self._sequence}
+
+
+event_bus = EventBus()
+
+
+def format_event(event_id: Optional[str], event_type: str, payload: bytes) -> bytes:
+    """Encode one Server-Sent Event"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event_type}\ndata: ".encode() + payload + b"\n\n"
+
+
+async def iter_event_stream(subscription: Subscription, complete: bool):
+    """Yield SSE frames for a subscription until the client disconnects"""
+    try:
+        yield f"retry: {EVENT_RETRY_MS}\n\n".encode()
+        # With local events other workers' writes never arrive, so clients
+        # must keep refetching after their own writes
+        yield format_event(None, READY, dump_json({"cluster_wide": EVENT_SOURCE == "change_stream"}))
+        if not complete:
+            yield format_event(None, RESYNC, b"{}")
+        while True:
+            if subscription.overflowed:
+                # Too slow to keep up: ask for a refetch and start afresh
+                subscription.reset()
+                yield format_event(None, RESYNC, b"{}")
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield format_event(*event)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+def attendance_removed(record: dict) -> dict:
+    """Event payload for a deleted attendance record"""
+    return encode_document({
+        "_id": record["_id"],
+        "employee_id": record["employee_id"],
+        "date": record["date"],
+        "status": record["status"],
+    })
+
+
+# Collections relayed by the change stream, and their event prefixes
+_WATCHED = {"attendance": "attendance", "employees": "employee"}
+
+_change_stream_task: Optional[asyncio.Task] = None
+
+
+def _change_event(change: dict) -> Optional[tuple[str, dict]]:
+    """Map a change stream document onto the events the handlers publish"""
+    collection = change["ns"]["coll"]
+    prefix = _WATCHED[collection]
+    operation = change["operationType"]
+    document = change.get("fullDocument")
+
+    if collection == "employees":
+        # Workers cache employees for EMPLOYEE_CACHE_TTL_SECONDS; drop them now
+        if document:
+            employee_cache.invalidate(document["employee_id"])
+            document.pop(SEARCH_FIELD, None)
+    collection_versions.bump(collection)
+
+    if operation == "insert":
+        return f"{prefix}.created", encode_document(document)
+    if operation in ("update", "replace"):
+        if document is None:
+            return None  # removed again before the lookup
+        if collection == "employees" and document.get("deleted_at") is not None:
+            # Tombstoned; the cascade's later writes are not announced
+            return f"{prefix}.deleted", {"employee_id": document["employee_id"]}
+        if collection == "attendance" and document.get("deletion_job") is not None:
+            return None  # claimed by the cascade, deleted next
+        return f"{prefix}.updated", encode_document(document)
+    if operation == "delete" and collection == "attendance":
+        return f"{prefix}.deleted", {"_id": str(change["documentKey"]["_id"])}
+    return None
+
+
+async def _watch_changes():
+    """Relay inserts, updates and deletes from MongoDB onto the bus"""
+    resume_token = None
+    pipeline = [{"$match": {"ns.coll": {"$in": list(_WATCHED)}}}]
+    while True:
+        try:
+            async with await get_database().watch(
+                pipeline, full_document="updateLookup", resume_after=resume_token
+            ) as stream:
+                print("✓ Watching MongoDB change stream for live events")
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    event = _change_event(change)
+                    if event is not None:
+                        event_bus.dispatch(*event)
+        except PyMongoError as exc:
+            print(f"⚠ Change stream failed, retrying in {CHANGE_STREAM_RETRY_SECONDS}s: {exc}")
+            # Clients may have missed events while the stream was down
+            event_bus.dispatch(RESYNC, {})
+            await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
+
+
+def start_event_source():
+    """Start the change stream relay when EVENT_SOURCE=change_stream"""
+    global _change_stream_task
+    if EVENT_SOURCE == "change_stream" and _change_stream_task is None:
+        # Fresh context so relayed commands are not attributed to a request
+        _change_stream_task = contextvars.Context().run(asyncio.create_task, _watch_changes())
+
+
+async def stop_event_source():
+    """Stop the change stream relay"""
+    global _change_stream_task
+    if _change_stream_task is not None:
+        _change_stream_task.cancel()
+        await asyncio.gather(_change_stream_task, return_exceptions=True)
+        _change_stream_task = None
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import zlib
+from app.serialization import encode_document
+
+# Columns written for each exported attendance record
+ATTENDANCE_EXPORT_FIELDS = ("_id", "employee_id", "full_name", "department", "date", "status", "created_at")
+
+# Rows are buffered into chunks of roughly this many bytes before sending
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_row(record: dict):
+    """Flatten a record into the export column order"""
+    encode_document(record)
+    return [record.get(field) for field in ATTENDANCE_EXPORT_FIELDS]
+
+
+async def iter_ndjson_export(records):
+    """Encode an async iterable of records as NDJSON chunks"""
+    buffer = []
+    size = 0
+    async for record in records:
+        line = json.dumps(dict(zip(ATTENDANCE_EXPORT_FIELDS, _export_row(record)))) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def iter_csv_export(records):
+    """Encode an async iterable of records as CSV chunks with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ATTENDANCE_EXPORT_FIELDS)
+    async for record in records:
+        writer.writerow(_export_row(record))
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks):
+    """Compress an async stream of byte chunks into a gzip stream"""
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_attendance_export(records, export_format: str, compress: bool = False):
+    """Stream attendance records in the requested format"""
+    if export_format == "csv":
+        chunks = iter_csv_export(records)
+    else:
+        chunks = iter_ndjson_export(records)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
@@ -0,0 +1,75 @@
+"""
+Liveness and readiness probes
+
+Readiness pings MongoDB with a short timeout and caches the result for
+HEALTH_CACHE_TTL_SECONDS, so frequent load balancer checks cost at most one
+ping per interval per process. Concurrent checks share a single in-flight
+ping.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Optional
+from dotenv import load_dotenv
+from pymongo.errors import PyMongoError
+from app.database import get_database
+from app.storage import uses_mongodb
+
+load_dotenv()
+
+# Seconds a readiness result is reused
+HEALTH_CACHE_TTL_SECONDS = float(os.getenv("HEALTH_CACHE_TTL_SECONDS", "2"))
+# Give up on the ping after this long and report the database as down
+HEALTH_PING_TIMEOUT_MS = int(os.getenv("HEALTH_PING_TIMEOUT_MS", "500"))
+
+_last_probe: Optional[dict] = None
+_last_probe_expires_at = 0.0
+_probe_in_flight: Optional[asyncio.Task] = None
+
+
+async def _ping_database() -> dict:
+    """Ping MongoDB once and report its state and latency"""
+    start = time.perf_counter()
+    if not uses_mongodb():
+        # The in-memory store is part of the process; there is nothing to ping
+        status, error = "up", None
+    else:
+        try:
+            await asyncio.wait_for(
+                get_database().command("ping"),
+                timeout=HEALTH_PING_TIMEOUT_MS / 1000,
+            )
+            status, error = "up", None
+        except asyncio.TimeoutError:
+            status, error = "down", f"ping timed out after {HEALTH_PING_TIMEOUT_MS}ms"
+        except (PyMongoError, RuntimeError) as exc:
+            status, error = "down", str(exc)
+    return {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        "error": error,
+        "checked_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def probe_database() -> dict:
+    """Cached database probe; returns the probe and whether it was cached"""
+    global _last_probe, _last_probe_expires_at, _probe_in_flight
+
+    if _last_probe is not None and _last_probe_expires_at > time.monotonic():
+        return {**_last_probe, "cached": True}
+
+    if _probe_in_flight is None:
+        _probe_in_flight = asyncio.ensure_future(_ping_database())
+    task = _probe_in_flight
+    try:
+        # Shielded so one cancelled health check does not abort the shared ping
+        probe = await asyncio.shield(task)
+    finally:
+        if _probe_in_flight is task and task.done():
+            _probe_in_flight = None
+    _last_probe = probe
+    _last_probe_expires_at = time.monotonic() + HEALTH_CACHE_TTL_SECONDS
+    return {**probe, "cached": False}
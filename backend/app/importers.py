@@ -0,0 +1,165 @@
+import codecs
+import csv
+import json
+
+# Columns an employee import file must provide
+EMPLOYEE_IMPORT_FIELDS = ("employee_id", "full_name", "email", "department")
+# Lines one CSV record (quoted fields with line breaks) may span
+CSV_MAX_RECORD_LINES = 100
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload cannot be parsed as the requested format"""
+
+
+def detect_import_format(content_type: str = None, requested: str = None):
+    """Resolve the upload format from the query parameter or Content-Type"""
+    if requested:
+        requested = requested.lower()
+        if requested not in ("csv", "ndjson"):
+            raise ImportFormatError("format must be 'csv' or 'ndjson'")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in IMPORT_FORMATS:
+        raise ImportFormatError(
+            "Unsupported upload type; send text/csv or application/x-ndjson"
+        )
+    return IMPORT_FORMATS[media_type]
+
+
+async def iter_lines(chunks):
+    """Decode an async stream of byte chunks into text lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class _NeedMoreLines(Exception):
+    """The CSV record being parsed continues past the buffered lines"""
+
+
+class _CSVLineBuffer:
+    """Lines fed to one csv.reader, refilled from an async stream
+
+    csv.reader cannot wait for input, but it restarts a record whose lines
+    ran out on its next call. The current record's lines are kept until it
+    parses and replayed once more lines arrive.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.position = 0
+        self.closed = False
+        # Set when the stream ended inside a record (an unclosed quote)
+        self.truncated = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position == len(self.lines):
+            if not self.closed:
+                raise _NeedMoreLines
+            self.truncated = self.position > 0
+            raise StopIteration
+        line = self.lines[self.position]
+        self.position += 1
+        return line + "\n"
+
+    def rewind(self):
+        self.position = 0
+
+    def consume(self):
+        """Drop the lines of the record just parsed"""
+        del self.lines[:self.position]
+        self.position = 0
+
+
+async def iter_csv_records(lines):
+    """Yield (row_number, record, error) for each data row of a CSV stream"""
+    buffer = _CSVLineBuffer()
+    reader = csv.reader(buffer)
+    header = None
+    row_number = 0
+
+    async def rows():
+        # (values, error) per record; a record never spans more than
+        # CSV_MAX_RECORD_LINES, so an unclosed quote costs one row, not the file
+        async for line in lines:
+            buffer.lines.append(line)
+            while True:
+                try:
+                    values = next(reader)
+                except _NeedMoreLines:
+                    buffer.rewind()
+                    if len(buffer.lines) <= CSV_MAX_RECORD_LINES:
+                        break
+                    del buffer.lines[0]
+                    yield None, "Unterminated quoted field"
+                    continue
+                buffer.consume()
+                yield values, None
+        buffer.closed = True
+        for values in reader:
+            yield (None, "Unterminated quoted field") if buffer.truncated else (values, None)
+
+    async for values, error in rows():
+        if error is None and not any(value.strip() for value in values):
+            continue
+
+        if header is None:
+            if error:
+                raise ImportFormatError(f"CSV header is invalid: {error}")
+            header = [column.strip() for column in values]
+            missing = [field for field in EMPLOYEE_IMPORT_FIELDS if field not in header]
+            if missing:
+                raise ImportFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+            continue
+
+        row_number += 1
+        if error:
+            yield row_number, None, error
+        elif len(values) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            yield row_number, dict(zip(header, values)), None
+
+    if header is None:
+        raise ImportFormatError("CSV upload is empty")
+
+
+async def iter_ndjson_records(lines):
+    """Yield (row_number, record, error) for each line of an NDJSON stream"""
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line), None
+        except ValueError as exc:
+            yield row_number, None, f"Invalid JSON: {exc}"
+
+
+def iter_import_records(chunks, import_format: str):
+    """Parse an uploaded byte stream incrementally into employee records"""
+    lines = iter_lines(chunks)
+    if import_format == "csv":
+        return iter_csv_records(lines)
+    return iter_ndjson_records(lines)
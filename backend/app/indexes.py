@@ -0,0 +1,162 @@
+"""
+Index management
+
+Declares the indexes backing the query shapes used in app/routes and
+reconciles them with the database: missing indexes are created, indexes
+whose options drifted (e.g. a non-unique `email` index) are rebuilt, and
+undeclared or unused indexes are reported but never dropped.
+
+Report only:            python -m app.indexes
+Create/rebuild indexes: python -m app.indexes --reconcile
+"""
+
+import argparse
+from dataclasses import dataclass
+from pymongo.errors import PyMongoError
+from app.database import get_database, run_with_mongo
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A required index and the queries it serves"""
+    keys: tuple
+    unique: bool = False
+    purpose: str = ""
+
+    @property
+    def name(self) -> str:
+        """Same naming scheme as pymongo's default index names"""
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+REQUIRED_INDEXES = {
+    "employees": [
+        IndexSpec((("employee_id", 1),), unique=True, purpose="lookups by employee_id; uniqueness"),
+        IndexSpec((("email", 1),), unique=True, purpose="email uniqueness"),
+        IndexSpec((("department", 1),), purpose="department filters and headcounts"),
+        IndexSpec((("deletion_job", 1),), purpose="employees tombstoned by a deletion job"),
+        IndexSpec((("search.employee_id", 1), ("_id", 1)), purpose="search: employee_id prefixes, in ranking order"),
+        IndexSpec((("search.full_name", 1), ("_id", 1)), purpose="search: name and name-word prefixes, in ranking order"),
+        IndexSpec((("search.email", 1), ("_id", 1)), purpose="search: email prefixes, in ranking order"),
+        IndexSpec((("search.department", 1), ("_id", 1)), purpose="search: department prefixes, in ranking order"),
+    ],
+    "attendance": [
+        IndexSpec((("employee_id", 1), ("date", 1)), unique=True, purpose="one record per employee per day; per-employee listings"),
+        IndexSpec((("date", 1), ("_id", 1)), purpose="keyset pagination of GET /attendance (date desc, _id desc); date-range exports"),
+        IndexSpec((("department", 1), ("date", 1), ("_id", 1)), purpose="department-filtered listings and exports"),
+    ],
+    "jobs": [
+        IndexSpec((("status", 1), ("heartbeat_at", 1)), purpose="resuming pending and abandoned jobs"),
+    ],
+    "attendance_monthly_rollups": [
+        IndexSpec((("employee_id", 1), ("month", 1)), unique=True, purpose="one rollup per employee per month"),
+    ],
+    "attendance_daily_rollups": [
+        IndexSpec((("date", 1), ("department", 1)), unique=True, purpose="one rollup per department per day"),
+    ],
+}
+
+
+def _key_tuple(index: dict) -> tuple:
+    """Normalise an index's key document for comparison"""
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in index["key"].items()
+    )
+
+
+async def _index_usage(collection) -> dict:
+    """Operation counts per index name since the server started"""
+    try:
+        cursor = await collection.aggregate([{"$indexStats": {}}])
+        return {stat["name"]: stat["accesses"]["ops"] async for stat in cursor}
+    except PyMongoError:
+        # $indexStats needs extra privileges on some deployments
+        return {}
+
+
+async def reconcile_indexes(apply: bool = True, check_usage: bool = False) -> dict:
+    """Compare declared indexes with the database and optionally fix drift
+
+    Idempotent: a second run with no schema changes does nothing. With
+    `check_usage`, indexes without operations since server start are
+    listed as unused.
+    """
+    report = {"created": [], "rebuilt": [], "missing": [], "failed": [], "undeclared": [], "unused": []}
+    database = get_database()
+
+    for collection_name, specs in REQUIRED_INDEXES.items():
+        collection = database[collection_name]
+        existing = {}
+        async for index in await collection.list_indexes():
+            existing[_key_tuple(index)] = index
+
+        for spec in specs:
+            label = f"{collection_name}.{spec.name}"
+            current = existing.pop(spec.keys, None)
+            if current is not None and bool(current.get("unique")) == spec.unique:
+                continue
+            if not apply:
+                report["missing"].append(label)
+                continue
+            try:
+                if current is not None:
+                    await collection.drop_index(current["name"])
+                await collection.create_index(list(spec.keys), unique=spec.unique, name=spec.name)
+                report["rebuilt" if current is not None else "created"].append(label)
+            except PyMongoError as e:
+                report["failed"].append(f"{label}: {e}")
+
+        existing.pop((("_id", 1),), None)
+        report["undeclared"].extend(f"{collection_name}.{index['name']}" for index in existing.values())
+
+        if not check_usage:
+            continue
+        usage = await _index_usage(collection)
+        report["unused"].extend(
+            f"{collection_name}.{name}"
+            for name, ops in usage.items()
+            if ops == 0 and name != "_id_"
+        )
+
+    return report
+
+
+def print_index_report(report: dict):
+    """Print a reconcile report in the startup log style"""
+    for label in report["created"]:
+        print(f"✓ Created index {label}")
+    for label in report["rebuilt"]:
+        print(f"✓ Rebuilt index {label}")
+    for label in report["missing"]:
+        print(f"⚠ Missing index {label}")
+    for label in report["failed"]:
+        print(f"⚠ Could not build index {label}")
+    for label in report["undeclared"]:
+        print(f"⚠ Undeclared index {label}")
+    for label in report["unused"]:
+        print(f"⚠ Unused index {label} (no operations since server start)")
+
+
+async def create_indexes():
+    """Create database indexes"""
+    try:
+        report = await reconcile_indexes()
+        print_index_report(report)
+        print("✓ Database indexes reconciled")
+    except PyMongoError as e:
+        print(f"⚠ Note: {e}")
+
+
+async def main(reconcile: bool):
+    report = await reconcile_indexes(apply=reconcile, check_usage=True)
+    print_index_report(report)
+    if not any(report.values()):
+        print("✓ All declared indexes present")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report or reconcile MongoDB indexes")
+    parser.add_argument("--reconcile", action="store_true", help="create and rebuild indexes")
+    args = parser.parse_args()
+    run_with_mongo(main, args.reconcile)
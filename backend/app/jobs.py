@@ -0,0 +1,237 @@
+"""
+Background jobs
+
+Long-running work such as the attendance cascade of an employee deletion
+runs as an asyncio task in the worker that accepted the request. Job state
+lives in the `jobs` collection so any worker can report it, and a job left
+unfinished by a stopped worker is picked up again on the next startup.
+"""
+
+import asyncio
+import contextvars
+import os
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from app.cache import EMPLOYEE_CACHE_TTL_SECONDS, employee_cache
+from app.dates import utcnow
+from app.etags import collection_versions
+from app.database import (
+    get_attendance_collection,
+    get_employees_collection,
+    get_jobs_collection,
+)
+from app.rollups import drop_employee_rollups, records_removed
+
+load_dotenv()
+
+# Attendance records removed per delete during a cascade
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "1000"))
+# A running job whose heartbeat is older than this is considered abandoned
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+# Runs of a job, including retries of failed runs on later startups
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+EMPLOYEE_DELETION = "employee_deletion"
+
+# Strong references to running tasks so they are not garbage collected
+_running = set()
+
+
+async def create_job(kind: str, params: dict, job_id: Optional[ObjectId] = None) -> dict:
+    """Record a new pending job"""
+    now = utcnow()
+    job = {
+        "_id": job_id or ObjectId(),
+        "kind": kind,
+        "status": "pending",
+        "params": params,
+        "progress": {"employees_deleted": 0, "records_deleted": 0},
+        "attempts": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "heartbeat_at": now,
+        "finished_at": None,
+    }
+    await get_jobs_collection().insert_one(job)
+    return job
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    """Look up a job by id"""
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await get_jobs_collection().find_one({"_id": ObjectId(job_id)})
+
+
+async def _update_job(job_id: ObjectId, fields: dict, progress: Optional[dict] = None):
+    """Persist job state and refresh its heartbeat"""
+    now = utcnow()
+    update = {"$set": {**fields, "updated_at": now, "heartbeat_at": now}}
+    if progress:
+        update["$inc"] = {f"progress.{key}": value for key, value in progress.items()}
+    await get_jobs_collection().update_one({"_id": job_id}, update)
+
+
+async def _claim_job(filter_query: dict) -> Optional[dict]:
+    """Atomically mark a job as running by this worker"""
+    now = utcnow()
+    return await get_jobs_collection().find_one_and_update(
+        filter_query,
+        {
+            "$set": {"status": "running", "updated_at": now, "heartbeat_at": now, "finished_at": None},
+            "$inc": {"attempts": 1},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _wait_for_cached_copies(job_id: ObjectId, deleted_at):
+    """Wait until no worker's employee cache can still return the employee
+
+    Until its cached copy expires, another worker may mark attendance for a
+    tombstoned employee. The heartbeat is kept fresh while waiting.
+    """
+    if not isinstance(deleted_at, datetime):
+        # Tombstoned before timestamps were BSON dates: long expired
+        return
+    while True:
+        remaining = EMPLOYEE_CACHE_TTL_SECONDS + 1 - (utcnow() - deleted_at).total_seconds()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, JOB_STALE_SECONDS / 2))
+        await _update_job(job_id, {})
+
+
+async def _delete_employee_attendance(job_id: ObjectId, employee: dict):
+    """Delete one employee's attendance in bounded batches
+
+    Records are claimed with the job id before they are read. Attendance
+    updates and deletes skip claimed records, so each batch is uncounted
+    from the rollups exactly as it was read. The last sweep for unclaimed
+    records runs once other workers' cached copies of the employee expired.
+    """
+    attendance = get_attendance_collection()
+    unclaimed = {"employee_id": employee["employee_id"], "deletion_job": {"$ne": job_id}}
+    await attendance.update_many(unclaimed, {"$set": {"deletion_job": job_id}})
+    caches_expired = False
+    while True:
+        records = await (
+            attendance.find(
+                {"employee_id": employee["employee_id"], "deletion_job": job_id},
+                {"employee_id": 1, "department": 1, "date": 1, "status": 1},
+            )
+            .limit(DELETE_BATCH_SIZE)
+            .to_list()
+        )
+        if not records:
+            # Claim records marked while the employee was being tombstoned
+            result = await attendance.update_many(unclaimed, {"$set": {"deletion_job": job_id}})
+            if result.modified_count:
+                continue
+            if caches_expired:
+                break
+            await _wait_for_cached_copies(job_id, employee.get("deleted_at"))
+            caches_expired = True
+            continue
+        await attendance.delete_many({"_id": {"$in": [record["_id"] for record in records]}})
+        collection_versions.bump("attendance")
+        for record in records:
+            # Written before snapshots existed: uncount it as the backfill would
+            record.setdefault("department", employee["department"])
+        await records_removed(records)
+        await _update_job(job_id, {}, {"records_deleted": len(records)})
+
+
+async def _run_employee_deletion(job: dict):
+    """Cascade the deletion of every employee tombstoned by this job"""
+    employees = get_employees_collection()
+    while True:
+        employee = await employees.find_one(
+            {"deletion_job": job["_id"]}, {"employee_id": 1, "department": 1, "deleted_at": 1}
+        )
+        if employee is None:
+            break
+        await _delete_employee_attendance(job["_id"], employee)
+        await drop_employee_rollups(employee["employee_id"])
+        await employees.delete_one({"_id": employee["_id"]})
+        employee_cache.invalidate(employee["employee_id"])
+        collection_versions.bump("employees")
+        await _update_job(job["_id"], {}, {"employees_deleted": 1})
+
+
+JOB_HANDLERS = {
+    EMPLOYEE_DELETION: _run_employee_deletion,
+}
+
+
+async def _run_job(job: dict):
+    """Run a claimed job and record its outcome"""
+    try:
+        await JOB_HANDLERS[job["kind"]](job)
+    except asyncio.CancelledError:
+        # Worker shutting down: hand the job back for the next startup
+        await _update_job(job["_id"], {"status": "pending"})
+        raise
+    except Exception as exc:
+        # Any failure, not just a database error, must not leave the job
+        # "running" until it goes stale
+        print(f"⚠ Job {job['_id']} failed: {exc!r}")
+        traceback.print_exc()
+        await _update_job(job["_id"], {"status": "failed", "error": repr(exc), "finished_at": utcnow()})
+        return
+    await _update_job(job["_id"], {"status": "completed", "error": None, "finished_at": utcnow()})
+
+
+def _start(job: dict):
+    # Run in a fresh context so the job is not attributed to the request
+    # that started it (see app/metrics.py)
+    task = contextvars.Context().run(asyncio.create_task, _run_job(job))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+async def start_job(job: dict):
+    """Claim a pending job and run it in the background"""
+    claimed = await _claim_job({"_id": job["_id"], "status": "pending"})
+    if claimed is not None:
+        _start(claimed)
+
+
+async def resume_jobs():
+    """Pick up pending jobs, jobs abandoned by a stopped worker and failed jobs
+
+    A failed job is retried until it has run JOB_MAX_ATTEMPTS times; its
+    employees stay tombstoned (ids and emails taken) until it completes.
+    """
+    stale_before = utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    resumed = 0
+    while True:
+        job = await _claim_job({
+            "$or": [
+                {"status": "pending"},
+                {"status": "running", "heartbeat_at": {"$lt": stale_before}},
+                # Heartbeats of workers from before timestamps were BSON dates
+                {"status": "running", "heartbeat_at": {"$type": "string"}},
+                # Jobs from before attempts were counted have none
+                {"status": "failed", "attempts": {"$not": {"$gte": JOB_MAX_ATTEMPTS}}},
+            ]
+        })
+        if job is None:
+            break
+        _start(job)
+        resumed += 1
+    if resumed:
+        print(f"✓ Resumed {resumed} background job(s)")
+
+
+async def stop_jobs():
+    """Cancel running jobs so they are resumed by the next startup"""
+    tasks = list(_running)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
@@ -7,13 +9,48 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import routes
-from app.routes import employees, attendance
+from app.routes import employees, attendance, dashboard, reports, jobs
+from app.database import (
+    CREATE_INDEXES_ON_STARTUP,
+    connect_to_mongo,
+    close_mongo_connection,
+)
+from app.indexes import create_indexes
+from app.pagination import NEXT_CURSOR_HEADER
+from app.cache import employee_cache
+from app.jobs import resume_jobs, stop_jobs
+from app.events import start_event_source, stop_event_source
+from app.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, pool_metrics, render_metrics
+from app.health import probe_database
+from app.storage import STORAGE_BACKEND, uses_mongodb
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the MongoDB connection pool on startup and close it on shutdown"""
+    if uses_mongodb():
+        await connect_to_mongo()
+        if CREATE_INDEXES_ON_STARTUP:
+            await create_indexes()
+        await resume_jobs()
+    else:
+        print(f"✓ Using the {STORAGE_BACKEND} storage backend; data is not persisted")
+    start_event_source()
+    try:
+        yield
+    finally:
+        await stop_event_source()
+        if uses_mongodb():
+            await stop_jobs()
+            await close_mongo_connection()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=os.getenv("API_TITLE", "HRMS Lite API"),
     description="A lightweight Human Resource Management System API",
     version=os.getenv("API_VERSION", "1.0.0"),
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -33,8 +70,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Outermost, so the timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 
 # Root endpoint
 @app.get("/")
@@ -48,17 +89,59 @@ async def read_root():
 
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness probe: the process is up and serving requests
+
+    Does not touch the database, so a database outage does not get the
+    process restarted; use /health/ready for routing decisions.
+    """
     return {
         "status": "healthy",
         "service": "HRMS Lite API",
     }
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: MongoDB answers a ping
+
+    The ping result is cached for HEALTH_CACHE_TTL_SECONDS and times out
+    after HEALTH_PING_TIMEOUT_MS, answering 503 when the database is down.
+    """
+    database = await probe_database()
+    ready = database["status"] == "up"
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "unavailable",
+            "service": "HRMS Lite API",
+            "database": database,
+            "pool": pool_metrics.stats(),
+        },
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """In-process cache hit/miss counters"""
+    return {
+        "employees": employee_cache.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request latency and MongoDB command metrics in Prometheus format"""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Include routes
 app.include_router(employees.router)
 app.include_router(attendance.router)
+app.include_router(dashboard.router)
+app.include_router(reports.router)
+app.include_router(jobs.router)
 
 
 @app.exception_handler(ValueError)
@@ -0,0 +1,449 @@
+"""
+In-memory storage backend
+
+An indexed, in-process implementation of app/repositories.py for tests,
+benchmarks and demos that should not need a MongoDB server. It mirrors the
+MongoDB indexes (see app/indexes.py) with plain Python structures:
+
+- hash indexes on employee ``employee_id`` and ``email``, which also
+  enforce their uniqueness
+- sorted ``(key, _id)`` lists per searched field for prefix search (keys
+  and ranking from app/search.py)
+- sorted lists of ``(employee_id, date, _id)``, ``(department, date, _id)``
+  and ``(date, _id)`` tuples, searched with bisect, for filtered, sorted
+  and cursor-paginated attendance reads
+- running present/absent totals and per-department headcounts
+
+Data lives in one worker and is lost on restart. Deletions run
+synchronously, so their jobs are already completed when returned.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+from bson.objectid import ObjectId
+from app.aggregations import build_attendance_summary
+from app.dates import day_start, utcnow
+from app.etags import collection_versions
+from app.jobs import EMPLOYEE_DELETION
+from app.repositories import AttendanceRepository, DuplicateError, EmployeeRepository, JobRepository
+from app.search import SEARCH_FIELDS, field_keys, rank_matches
+from app.snapshots import SNAPSHOT_FIELDS, employee_snapshot
+
+# Sorts after every stored attendance date and _id; closes index ranges
+_MAX_DATE = datetime.max
+_MAX_OBJECT_ID = ObjectId("f" * 24)
+
+
+def _report_period(day: datetime, bucket: Optional[str]) -> Optional[str]:
+    """Report bucket label of a day: YYYY-MM, or the Monday of its week"""
+    if bucket == "month":
+        return day.strftime("%Y-%m")
+    if bucket == "week":
+        return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+    return None
+
+
+class MemoryStore:
+    """Employees, attendance and their indexes, shared by both repositories"""
+
+    def __init__(self):
+        self.employees = {}  # _id -> employee
+        self.employee_order = []  # sorted employee _ids
+        self.by_employee_id = {}  # employee_id -> _id
+        self.by_email = {}  # email -> _id
+        self.headcounts = Counter()  # department -> employees
+        self.search_keys = {field: [] for field in SEARCH_FIELDS}  # field -> sorted (key, _id)
+
+        self.records = {}  # _id -> attendance record
+        self.by_day = {}  # (employee_id, date) -> _id
+        self.by_employee_date = []  # sorted (employee_id, date, _id)
+        self.by_department_date = []  # sorted (department, date, _id)
+        self.by_date = []  # sorted (date, _id)
+        self.totals = Counter()  # status -> records
+
+        self.jobs = {}  # str(_id) -> job
+
+    # Employees
+
+    def add_employee(self, document: dict):
+        if document["employee_id"] in self.by_employee_id:
+            raise DuplicateError("employee_id")
+        if document["email"] in self.by_email:
+            raise DuplicateError("email")
+        document.setdefault("_id", ObjectId())
+        employee = dict(document)
+        self.employees[employee["_id"]] = employee
+        insort(self.employee_order, employee["_id"])
+        self.by_employee_id[employee["employee_id"]] = employee["_id"]
+        self.by_email[employee["email"]] = employee["_id"]
+        self.headcounts[employee["department"]] += 1
+        self.index_search_keys(employee, SEARCH_FIELDS)
+
+    def index_search_keys(self, employee: dict, fields, remove: bool = False):
+        for field in fields:
+            index = self.search_keys[field]
+            for key in field_keys(field, employee[field]):
+                if remove:
+                    self._unindex(index, (key, employee["_id"]))
+                else:
+                    insort(index, (key, employee["_id"]))
+
+    def update_employee(self, employee: dict, fields: dict):
+        email = fields.get("email", employee["email"])
+        if email != employee["email"]:
+            if email in self.by_email:
+                raise DuplicateError("email")
+            del self.by_email[employee["email"]]
+            self.by_email[email] = employee["_id"]
+        searched = [field for field in SEARCH_FIELDS if field in fields]
+        self.index_search_keys(employee, searched, remove=True)
+        self.headcounts[employee["department"]] -= 1
+        employee.update(fields)
+        self.headcounts[employee["department"]] += 1
+        self.index_search_keys(employee, searched)
+
+    def remove_employee(self, employee: dict) -> int:
+        """Remove an employee and their attendance; returns the records removed"""
+        record_ids = [entry[-1] for entry in self.scan(self.by_employee_date, (employee["employee_id"],))]
+        for record_id in record_ids:
+            self.remove_record(self.records[record_id])
+        del self.employees[employee["_id"]]
+        del self.employee_order[bisect_left(self.employee_order, employee["_id"])]
+        del self.by_employee_id[employee["employee_id"]]
+        del self.by_email[employee["email"]]
+        self.headcounts[employee["department"]] -= 1
+        self.index_search_keys(employee, SEARCH_FIELDS, remove=True)
+        return len(record_ids)
+
+    def employee(self, employee_id: str) -> Optional[dict]:
+        object_id = self.by_employee_id.get(employee_id)
+        return self.employees[object_id] if object_id is not None else None
+
+    # Attendance
+
+    @staticmethod
+    def _unindex(index: list, entry: tuple):
+        del index[bisect_left(index, entry)]
+
+    def add_record(self, document: dict):
+        key = (document["employee_id"], document["date"])
+        if key in self.by_day:
+            raise DuplicateError("employee_id")
+        document.setdefault("_id", ObjectId())
+        record = dict(document)
+        record_id = record["_id"]
+        self.records[record_id] = record
+        self.by_day[key] = record_id
+        insort(self.by_employee_date, (record["employee_id"], record["date"], record_id))
+        insort(self.by_department_date, (record["department"], record["date"], record_id))
+        insort(self.by_date, (record["date"], record_id))
+        self.totals[record["status"]] += 1
+
+    def remove_record(self, record: dict):
+        record_id = record["_id"]
+        del self.records[record_id]
+        del self.by_day[(record["employee_id"], record["date"])]
+        self._unindex(self.by_employee_date, (record["employee_id"], record["date"], record_id))
+        self._unindex(self.by_department_date, (record["department"], record["date"], record_id))
+        self._unindex(self.by_date, (record["date"], record_id))
+        self.totals[record["status"]] -= 1
+
+    def move_record(self, record: dict, department: str):
+        """Re-key a record in the department index"""
+        self._unindex(self.by_department_date, (record["department"], record["date"], record["_id"]))
+        record["department"] = department
+        insort(self.by_department_date, (department, record["date"], record["_id"]))
+
+    @staticmethod
+    def scan(
+        index: list,
+        prefix: tuple = (),
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        before: Optional[tuple] = None,
+        descending: bool = False,
+    ):
+        """Yield index entries with the prefix, dated start..end and before `before`"""
+        lo = bisect_left(index, (*prefix, start) if start else prefix)
+        if end:
+            hi = bisect_right(index, (*prefix, end, _MAX_OBJECT_ID))
+        else:
+            hi = bisect_left(index, (*prefix, _MAX_DATE))
+        if before:
+            hi = min(hi, bisect_left(index, (*prefix, *before)))
+        # Slice first so writes during iteration do not shift positions
+        entries = index[lo:hi]
+        return reversed(entries) if descending else iter(entries)
+
+    def select_records(self, employee_id=None, department=None, start_date=None, end_date=None,
+                       after=None, descending=False):
+        """Yield matching records using the most selective index"""
+        if employee_id:
+            index, prefix = self.by_employee_date, (employee_id,)
+        elif department:
+            index, prefix = self.by_department_date, (department,)
+        else:
+            index, prefix = self.by_date, ()
+        entries = self.scan(
+            index,
+            prefix,
+            day_start(start_date) if start_date else None,
+            day_start(end_date) if end_date else None,
+            after,
+            descending,
+        )
+        for entry in entries:
+            record = self.records.get(entry[-1])
+            if record is None:
+                continue
+            if employee_id and department and record["department"] != department:
+                continue
+            yield record
+
+
+class MemoryEmployeeRepository(EmployeeRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def get(self, employee_id: str) -> Optional[dict]:
+        employee = self.store.employee(employee_id)
+        return dict(employee) if employee else None
+
+    async def get_many(self, values: list) -> dict:
+        found = {}
+        for value in dict.fromkeys(values):
+            employee = self.store.employees.get(ObjectId(value)) if ObjectId.is_valid(value) else None
+            employee = employee or self.store.employee(value)
+            if employee is not None:
+                found[value] = dict(employee)
+        return found
+
+    async def select(self, employee_ids: Optional[list] = None, department: Optional[str] = None) -> list:
+        if department:
+            employees = (e for e in self.store.employees.values() if e["department"] == department)
+        else:
+            employees = filter(None, (self.store.employee(value) for value in dict.fromkeys(employee_ids or [])))
+        return [dict(employee) for employee in employees]
+
+    async def find_page(self, skip: int, limit: int, after: Optional[ObjectId] = None) -> list:
+        order = self.store.employee_order
+        start = (bisect_right(order, after) if after is not None else 0) + skip
+        return [dict(self.store.employees[object_id]) for object_id in order[start:start + limit]]
+
+    async def create(self, document: dict):
+        self.store.add_employee(document)
+
+    async def create_many(self, documents: list) -> dict:
+        errors = {}
+        for index, document in enumerate(documents):
+            try:
+                self.store.add_employee(document)
+            except DuplicateError as exc:
+                errors[index] = exc
+        return errors
+
+    async def update(self, employee_id: str, fields: dict) -> Optional[dict]:
+        employee = self.store.employee(employee_id)
+        if employee is None:
+            return None
+        previous = dict(employee)
+        self.store.update_employee(employee, fields)
+        return previous
+
+    async def delete(self, params: dict) -> Optional[dict]:
+        if "employee_id" in params:
+            employees = [self.store.employee(params["employee_id"])]
+        else:
+            employees = [e for e in self.store.employees.values() if e["department"] == params["department"]]
+        employees = [employee for employee in employees if employee is not None]
+        if not employees:
+            return None
+
+        records_deleted = sum(self.store.remove_employee(employee) for employee in employees)
+        if records_deleted:
+            collection_versions.bump("attendance")
+        now = utcnow()
+        job = {
+            "_id": ObjectId(),
+            "kind": EMPLOYEE_DELETION,
+            "status": "completed",
+            "params": params,
+            "progress": {"employees_deleted": len(employees), "records_deleted": records_deleted},
+            "attempts": 1,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "heartbeat_at": now,
+            "finished_at": now,
+        }
+        self.store.jobs[str(job["_id"])] = job
+        return job
+
+    async def search(self, query: str, limit: int) -> list:
+        candidates = []
+        for field in SEARCH_FIELDS:
+            index = self.store.search_keys[field]
+            found = {}
+            # The first `limit` employees in key order, as a MongoDB index scan
+            position = bisect_left(index, (query,))
+            while position < len(index) and len(found) < limit:
+                key, object_id = index[position]
+                if not key.startswith(query):
+                    break
+                found.setdefault(object_id, self.store.employees[object_id])
+                position += 1
+            candidates.extend(dict(employee) for employee in found.values())
+        return rank_matches(candidates, query, limit)
+
+    async def department_headcounts(self) -> list:
+        return [
+            {"department": department, "employees": count}
+            for department, count in sorted(self.store.headcounts.items())
+            if count
+        ]
+
+
+class MemoryAttendanceRepository(AttendanceRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def get(self, record_id: ObjectId) -> Optional[dict]:
+        record = self.store.records.get(record_id)
+        return dict(record) if record else None
+
+    async def create(self, document: dict):
+        self.store.add_record(document)
+
+    async def create_many(self, documents: list) -> dict:
+        errors = {}
+        for index, document in enumerate(documents):
+            try:
+                self.store.add_record(document)
+            except DuplicateError as exc:
+                errors[index] = exc
+        return errors
+
+    async def find_page(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        after=None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list:
+        page = []
+        records = self.store.select_records(
+            employee_id, department, start_date, end_date, after, descending=True
+        )
+        for record in records:
+            if skip:
+                skip -= 1
+                continue
+            if len(page) >= limit:
+                break
+            page.append(dict(record))
+        return page
+
+    async def iter_export(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ):
+        for record in self.store.select_records(employee_id, department, start_date, end_date):
+            yield dict(record)
+
+    async def update_status(self, record_id: ObjectId, status: str) -> Optional[dict]:
+        record = self.store.records.get(record_id)
+        if record is None:
+            return None
+        previous = dict(record)
+        self.store.totals[record["status"]] -= 1
+        record["status"] = status
+        self.store.totals[status] += 1
+        return previous
+
+    async def delete(self, record_id: ObjectId) -> Optional[dict]:
+        record = self.store.records.get(record_id)
+        if record is not None:
+            self.store.remove_record(record)
+        return record
+
+    async def recent(self, limit: int) -> list:
+        records = self.store.select_records(descending=True)
+        return [dict(record) for _, record in zip(range(limit), records)]
+
+    async def summary(
+        self,
+        employee_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        counts = Counter(
+            (record["date"].strftime("%Y-%m"), record["status"])
+            for record in self.store.select_records(employee_id, None, start_date, end_date)
+        )
+        groups = [
+            {"_id": {"month": month, "status": status}, "count": count}
+            for (month, status), count in counts.items()
+        ]
+        return build_attendance_summary(employee_id, groups)
+
+    async def totals(self) -> dict:
+        return {"present": self.store.totals["Present"], "absent": self.store.totals["Absent"]}
+
+    async def department_day(self, day: date) -> list:
+        counts = defaultdict(Counter)
+        for record in self.store.select_records(start_date=day, end_date=day):
+            counts[record["department"]][record["status"]] += 1
+        return [
+            {"department": department, "present": status["Present"], "absent": status["Absent"]}
+            for department, status in sorted(counts.items())
+        ]
+
+    async def department_report_groups(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        bucket: Optional[str] = None,
+        department: Optional[str] = None,
+    ) -> list:
+        # Counts raw records in the range; there are no daily rollups here
+        counts = defaultdict(Counter)
+        for record in self.store.select_records(None, department, start_date, end_date):
+            counts[(record["department"], _report_period(record["date"], bucket))][record["status"]] += 1
+        return [
+            {
+                "department": key[0],
+                "period": key[1],
+                "present": status["Present"],
+                "absent": status["Absent"],
+            }
+            for key, status in sorted(counts.items())
+        ]
+
+    async def propagate_snapshot(self, previous: dict, employee: dict):
+        snapshot = employee_snapshot(employee)
+        if employee_snapshot(previous) == snapshot:
+            return
+        record_ids = [entry[-1] for entry in self.store.scan(self.store.by_employee_date, (employee["employee_id"],))]
+        for record_id in record_ids:
+            record = self.store.records[record_id]
+            if record["department"] != snapshot["department"]:
+                self.store.move_record(record, snapshot["department"])
+            for field in SNAPSHOT_FIELDS:
+                record[field] = snapshot[field]
+        collection_versions.bump("attendance")
+
+
+class MemoryJobRepository(JobRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return self.store.jobs.get(job_id)
@@ -0,0 +1,256 @@
+"""
+Request and database metrics in Prometheus text format
+
+MetricsMiddleware times every HTTP request by route template and counts
+in-flight requests; CommandMetrics (a pymongo command listener, registered
+in app/database.py) times every MongoDB command and attributes it to the
+request that issued it through a context variable. Everything is kept in
+plain dicts in this process, so the cost per request is a few dict updates.
+With several workers each process reports its own numbers.
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+from pymongo import monitoring
+
+# Upper bounds in seconds for latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds for the number of MongoDB commands per request
+COMMAND_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+request_commands = Histogram(
+    "http_request_mongodb_commands",
+    "MongoDB commands issued per HTTP request",
+    ("method", "route"),
+    COMMAND_COUNT_BUCKETS,
+)
+request_database_time = Histogram(
+    "http_request_mongodb_duration_seconds",
+    "Time spent in MongoDB commands per HTTP request",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+command_latency = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by command name",
+    ("command",),
+    LATENCY_BUCKETS,
+)
+command_failures = Counter(
+    "mongodb_command_failures_total",
+    "Failed MongoDB commands by command name",
+    ("command",),
+)
+
+_in_flight = 0
+
+# [command count, seconds in MongoDB] for the request being served
+_request_database_usage: ContextVar[Optional[list]] = ContextVar("request_database_usage", default=None)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records MongoDB command latency, globally and per request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        command_failures.inc((event.command_name,))
+        self._record(event)
+
+    def _record(self, event):
+        seconds = event.duration_micros / 1_000_000
+        command_latency.observe((event.command_name,), seconds)
+        usage = _request_database_usage.get()
+        if usage is not None:
+            usage[0] += 1
+            usage[1] += seconds
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks MongoDB connection pool usage across all servers"""
+
+    def __init__(self):
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.cleared = 0
+
+    def stats(self) -> dict:
+        return {
+            "open_connections": self.open,
+            "in_use": self.in_use,
+            "available": self.open - self.in_use,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_cleared": self.cleared,
+        }
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_checked_out(self, event):
+        self.in_use += 1
+        self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def pool_cleared(self, event):
+        self.cleared += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_metrics = PoolMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing requests by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        usage = [0, 0.0]
+        token = _request_database_usage.set(usage)
+        _in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_flight -= 1
+            _request_database_usage.reset(token)
+            route = scope.get("route")
+            # Templates keep the label set bounded; unmatched paths share one label
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            request_latency.observe((method, path, status_code), elapsed)
+            request_commands.observe((method, path), usage[0])
+            request_database_time.observe((method, path), usage[1])
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = [
+        "# HELP http_requests_in_flight HTTP requests currently being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_in_flight}",
+    ]
+    pool = pool_metrics.stats()
+    for metric, kind, value in (
+        ("mongodb_pool_open_connections", "gauge", pool["open_connections"]),
+        ("mongodb_pool_connections_in_use", "gauge", pool["in_use"]),
+        ("mongodb_pool_checkouts_total", "counter", pool["checkouts"]),
+        ("mongodb_pool_checkout_failures_total", "counter", pool["checkout_failures"]),
+        ("mongodb_pool_cleared_total", "counter", pool["pool_cleared"]),
+    ):
+        lines.extend([f"# TYPE {metric} {kind}", f"{metric} {value}"])
+    for metric in (request_latency, request_commands, request_database_time, command_latency, command_failures):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,360 @@
+"""
+MongoDB storage backend
+
+The production implementation of app/repositories.py: unique indexes
+enforce employee_id/email and one record per employee per day, the
+in-process employee cache serves lookups, every attendance write adjusts
+the rollups, and deletions tombstone employees and cascade in a background
+job.
+"""
+
+import asyncio
+from datetime import date, timedelta
+from typing import Optional
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.aggregations import attendance_summary_pipeline, build_attendance_summary, date_range_filter
+from app.cache import employee_cache, find_employee, find_employees
+from app.database import (
+    ACTIVE_EMPLOYEE_FILTER,
+    DUPLICATE_KEY_ERROR,
+    duplicate_key_field,
+    get_attendance_collection,
+    get_employees_collection,
+)
+from app.dates import utcnow
+from app.exporters import ATTENDANCE_EXPORT_FIELDS
+from app.jobs import EMPLOYEE_DELETION, create_job, get_job, start_job
+from app.repositories import AttendanceRepository, DuplicateError, EmployeeRepository, JobRepository, StorageError
+from app.rollups import (
+    apply_attendance_deltas,
+    build_rollup_summary,
+    get_attendance_totals,
+    get_department_daily_rollups,
+    get_department_report_groups,
+    get_employee_monthly_rollups,
+    record_marked,
+    record_removed,
+    record_status_changed,
+)
+from app.search import PREFIX_END, SEARCH_FIELD, SEARCH_FIELDS, rank_matches, search_keys, search_updates
+from app.serialization import ATTENDANCE_PROJECTION, EMPLOYEE_PROJECTION
+from app.snapshots import SNAPSHOT_PROJECTION, fill_missing_snapshots, propagate_employee_snapshot
+
+# Documents fetched per cursor round trip while exporting
+EXPORT_BATCH_SIZE = 2000
+# Attendance not yet claimed by an employee deletion job (see app/jobs.py);
+# claimed records are about to be removed and uncounted as they are
+UNCLAIMED_RECORD_FILTER = {"deletion_job": {"$exists": False}}
+
+
+def _write_errors(exc: BulkWriteError) -> dict:
+    """Index -> StorageError for the rejected documents of an unordered insert"""
+    errors = {}
+    for error in exc.details.get("writeErrors", []):
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            errors[error["index"]] = DuplicateError(duplicate_key_field(error))
+        else:
+            errors[error["index"]] = StorageError(error.get("errmsg", "Write failed"))
+    return errors
+
+
+def _with_search_keys(document: dict) -> dict:
+    """Copy of a new employee with its search keys, for insertion
+
+    The _id is set on the caller's document, which is returned to clients
+    without the keys.
+    """
+    document.setdefault("_id", ObjectId())
+    return {**document, SEARCH_FIELD: search_keys(document)}
+
+
+def _attendance_filter(employee_id=None, department=None, start_date=None, end_date=None) -> dict:
+    filter_query = {}
+    date_filter = date_range_filter(start_date, end_date)
+    if date_filter:
+        filter_query["date"] = date_filter
+    if employee_id:
+        filter_query["employee_id"] = employee_id
+    if department:
+        filter_query["department"] = department
+    return filter_query
+
+
+def _is_month_aligned(start_date: Optional[date], end_date: Optional[date]):
+    """Whether a date range covers whole calendar months"""
+    if start_date and start_date.day != 1:
+        return False
+    if end_date and (end_date + timedelta(days=1)).day != 1:
+        return False
+    return True
+
+
+class MongoEmployeeRepository(EmployeeRepository):
+    async def get(self, employee_id: str) -> Optional[dict]:
+        return await find_employee(employee_id)
+
+    async def get_many(self, values: list) -> dict:
+        return await find_employees(values)
+
+    async def select(self, employee_ids: Optional[list] = None, department: Optional[str] = None) -> list:
+        filter_query = dict(ACTIVE_EMPLOYEE_FILTER)
+        if department:
+            filter_query["department"] = department
+        else:
+            filter_query["employee_id"] = {"$in": list(employee_ids or [])}
+        return await get_employees_collection().find(
+            filter_query, {"employee_id": 1, **SNAPSHOT_PROJECTION}
+        ).to_list()
+
+    async def find_page(self, skip: int, limit: int, after: Optional[ObjectId] = None) -> list:
+        filter_query = dict(ACTIVE_EMPLOYEE_FILTER)
+        if after is not None:
+            filter_query["_id"] = {"$gt": after}
+        return await (
+            get_employees_collection()
+            .find(filter_query, EMPLOYEE_PROJECTION)
+            .sort("_id", 1)
+            .skip(skip)
+            .limit(limit)
+            .to_list()
+        )
+
+    async def create(self, document: dict):
+        # Uniqueness of employee_id and email is enforced by unique indexes
+        try:
+            await get_employees_collection().insert_one(_with_search_keys(document))
+        except DuplicateKeyError as exc:
+            raise DuplicateError(duplicate_key_field(exc.details))
+        employee_cache.invalidate(document["employee_id"])
+
+    async def create_many(self, documents: list) -> dict:
+        # Duplicate employee_id/email rows are rejected individually by the
+        # unique indexes without aborting the rest of the batch
+        try:
+            await get_employees_collection().insert_many(
+                [_with_search_keys(document) for document in documents], ordered=False
+            )
+        except BulkWriteError as exc:
+            return _write_errors(exc)
+        return {}
+
+    async def update(self, employee_id: str, fields: dict) -> Optional[dict]:
+        # One round trip, getting the previous version back for the snapshot
+        # propagation; a taken email is rejected by the unique email index
+        try:
+            previous = await get_employees_collection().find_one_and_update(
+                {"employee_id": employee_id, **ACTIVE_EMPLOYEE_FILTER},
+                {"$set": {**fields, **search_updates(fields)}},
+                return_document=ReturnDocument.BEFORE,
+                projection={SEARCH_FIELD: 0},
+            )
+        except DuplicateKeyError:
+            raise DuplicateError("email")
+        employee_cache.invalidate(employee_id)
+        return previous
+
+    async def delete(self, params: dict) -> Optional[dict]:
+        # Tombstone before the job exists, so no worker can run it early
+        job_id = ObjectId()
+        result = await get_employees_collection().update_many(
+            {**params, **ACTIVE_EMPLOYEE_FILTER},
+            {"$set": {"deleted_at": utcnow(), "deletion_job": job_id}},
+        )
+        if "employee_id" in params:
+            employee_cache.invalidate(params["employee_id"])
+        else:
+            employee_cache.clear()
+        if result.modified_count == 0:
+            return None
+
+        job = await create_job(EMPLOYEE_DELETION, params, job_id)
+        await start_job(job)
+        return job
+
+    async def search(self, query: str, limit: int) -> list:
+        employees = get_employees_collection()
+
+        def lookup(field):
+            # Walks the field's key index from the prefix; no sort, so the
+            # first matches in index order are returned. $elemMatch makes one
+            # key satisfy both bounds, which also lets them bound the scan.
+            key = f"{SEARCH_FIELD}.{field}"
+            prefix_range = {"$gte": query, "$lt": query + PREFIX_END}
+            return (
+                employees.find(
+                    {key: {"$elemMatch": prefix_range}, **ACTIVE_EMPLOYEE_FILTER},
+                    EMPLOYEE_PROJECTION,
+                )
+                .hint([(key, 1), ("_id", 1)])
+                .limit(limit)
+                .to_list()
+            )
+
+        results = await asyncio.gather(*(lookup(field) for field in SEARCH_FIELDS))
+        return rank_matches([employee for found in results for employee in found], query, limit)
+
+    async def department_headcounts(self) -> list:
+        cursor = await get_employees_collection().aggregate([
+            {"$match": ACTIVE_EMPLOYEE_FILTER},
+            {"$group": {"_id": "$department", "employees": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ])
+        return [
+            {"department": group["_id"], "employees": group["employees"]}
+            async for group in cursor
+        ]
+
+
+class MongoAttendanceRepository(AttendanceRepository):
+    async def get(self, record_id: ObjectId) -> Optional[dict]:
+        return await get_attendance_collection().find_one({"_id": record_id})
+
+    async def create(self, document: dict):
+        # The unique (employee_id, date) index rejects a second mark for the day
+        try:
+            await get_attendance_collection().insert_one(document)
+        except DuplicateKeyError:
+            raise DuplicateError("employee_id")
+        await record_marked(document)
+
+    async def create_many(self, documents: list) -> dict:
+        # Unordered insert: the unique (employee_id, date) index rejects
+        # duplicates individually without aborting the rest of the batch
+        errors = {}
+        try:
+            await get_attendance_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as exc:
+            errors = _write_errors(exc)
+        await apply_attendance_deltas(
+            (doc["employee_id"], doc["department"], doc["date"],
+             int(doc["status"] == "Present"), int(doc["status"] == "Absent"))
+            for index, doc in enumerate(documents)
+            if index not in errors
+        )
+        return errors
+
+    async def find_page(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        after=None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list:
+        filter_query = _attendance_filter(employee_id, department, start_date, end_date)
+        if after is not None:
+            day, last_id = after
+            filter_query = {"$and": [filter_query, {
+                "$or": [
+                    {"date": {"$lt": day}},
+                    {"date": day, "_id": {"$lt": last_id}},
+                ]
+            }]}
+        return await (
+            get_attendance_collection()
+            .find(filter_query, ATTENDANCE_PROJECTION)
+            .sort([("date", -1), ("_id", -1)])
+            .skip(skip)
+            .limit(limit)
+            .to_list()
+        )
+
+    async def iter_export(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ):
+        cursor = (
+            get_attendance_collection()
+            .find(
+                _attendance_filter(employee_id, department, start_date, end_date),
+                {field: 1 for field in ATTENDANCE_EXPORT_FIELDS},
+                allow_disk_use=True,
+            )
+            .sort([("date", 1), ("_id", 1)])
+            .batch_size(EXPORT_BATCH_SIZE)
+        )
+        try:
+            async for record in cursor:
+                yield record
+        finally:
+            await cursor.close()
+
+    async def update_status(self, record_id: ObjectId, status: str) -> Optional[dict]:
+        # One round trip: the previous version is returned so the rollups can
+        # move the record between counters
+        record = await get_attendance_collection().find_one_and_update(
+            {"_id": record_id, **UNCLAIMED_RECORD_FILTER},
+            {"$set": {"status": status}},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if record is not None:
+            await fill_missing_snapshots([record])
+            await record_status_changed(record, status)
+        return record
+
+    async def delete(self, record_id: ObjectId) -> Optional[dict]:
+        record = await get_attendance_collection().find_one_and_delete({"_id": record_id, **UNCLAIMED_RECORD_FILTER})
+        if record is not None:
+            await fill_missing_snapshots([record])
+            await record_removed(record)
+        return record
+
+    async def recent(self, limit: int) -> list:
+        return await (
+            get_attendance_collection()
+            .find()
+            .sort([("date", -1), ("_id", -1)])
+            .limit(limit)
+            .to_list()
+        )
+
+    async def summary(
+        self,
+        employee_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        # Whole-month ranges are answered from the monthly rollups; arbitrary
+        # day ranges fall back to counting records in the database
+        if _is_month_aligned(start_date, end_date):
+            rollups = await get_employee_monthly_rollups(
+                employee_id,
+                start_date.isoformat()[:7] if start_date else None,
+                end_date.isoformat()[:7] if end_date else None,
+            )
+            return build_rollup_summary(employee_id, rollups)
+
+        cursor = await get_attendance_collection().aggregate(
+            attendance_summary_pipeline(employee_id, start_date, end_date)
+        )
+        return build_attendance_summary(employee_id, await cursor.to_list())
+
+    async def totals(self) -> dict:
+        return await get_attendance_totals()
+
+    async def department_day(self, day: date) -> list:
+        return await get_department_daily_rollups(day)
+
+    async def department_report_groups(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        bucket: Optional[str] = None,
+        department: Optional[str] = None,
+    ) -> list:
+        return await get_department_report_groups(start_date, end_date, bucket, department)
+
+    async def propagate_snapshot(self, previous: dict, employee: dict):
+        await propagate_employee_snapshot(previous, employee)
+
+
+class MongoJobRepository(JobRepository):
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await get_job(job_id)
@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Callable, Optional
+from bson.objectid import ObjectId
+from fastapi import HTTPException, status
+from app.dates import day_start, iso_day
+
+# Response header carrying the opaque token for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(**values) -> str:
+    """Encode the sort key of the last returned document as an opaque token"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Decode a token produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if not isinstance(values, dict) or not ObjectId.is_valid(values.get("id")):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def employee_cursor(employee: dict) -> str:
+    """Cursor for employee listings, ordered by _id ascending"""
+    return encode_cursor(id=str(employee["_id"]))
+
+
+def employee_cursor_position(token: str) -> ObjectId:
+    """The _id of the last employee before the cursor"""
+    values = decode_cursor(token)
+    return ObjectId(values["id"])
+
+
+def attendance_cursor(record: dict) -> str:
+    """Cursor for attendance listings, ordered by (date, _id) descending"""
+    return encode_cursor(date=iso_day(record["date"]), id=str(record["_id"]))
+
+
+def attendance_cursor_position(token: str) -> tuple[datetime, ObjectId]:
+    """The (date, _id) of the last attendance record before the cursor"""
+    values = decode_cursor(token)
+    try:
+        day = day_start(date.fromisoformat(values.get("date")))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return day, ObjectId(values["id"])
+
+
+async def fetch_page(
+    find_page: Callable,
+    position: Callable,
+    encode: Callable,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    headers: dict,
+) -> list:
+    """Fetch one page from `find_page(skip=, limit=, after=)`
+
+    A cursor is decoded with `position` and replaces `skip`; when more
+    documents follow, the cursor for the last one is set in `headers`.
+    """
+    after = None
+    if cursor:
+        try:
+            after = position(cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc),
+            )
+        skip = 0
+    
+    # Fetch one extra document to know whether another page exists
+    page = await find_page(skip=skip, limit=limit + 1, after=after)
+    if len(page) > limit:
+        page = page[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode(page[-1])
+    return page
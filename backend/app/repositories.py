@@ -0,0 +1,195 @@
+"""
+Storage interfaces for employees, attendance and jobs
+
+Routes read and write through these repositories, injected with FastAPI
+dependencies (see app/storage.py), instead of using collections directly.
+Implementations take and return Mongo-shaped documents: an ObjectId
+``_id``, attendance days and timestamps as datetimes. Responses are
+therefore encoded the same way whichever backend is configured.
+
+Cursors are decoded by the routes (app/pagination.py) and passed in as
+positions: the ``_id`` of the last employee, or the ``(date, _id)`` of the
+last attendance record of the previous page.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
+from bson.objectid import ObjectId
+
+
+class StorageError(Exception):
+    """A write rejected by the storage backend"""
+
+
+class DuplicateError(StorageError):
+    """A write that would break a unique key
+
+    `field` names the leading field of the key, e.g. "email".
+    """
+
+    def __init__(self, field: Optional[str] = None):
+        super().__init__(f"Duplicate {field or 'key'}")
+        self.field = field
+
+
+class EmployeeRepository(ABC):
+    """Active (not deleted) employees"""
+
+    @abstractmethod
+    async def get(self, employee_id: str) -> Optional[dict]:
+        """Look up an employee by `employee_id`"""
+
+    @abstractmethod
+    async def get_many(self, values: list) -> dict:
+        """Resolve mixed `_id`/`employee_id` values, returning value -> employee
+
+        A value that is a valid ObjectId is tried as an `_id` first.
+        """
+
+    @abstractmethod
+    async def select(self, employee_ids: Optional[list] = None, department: Optional[str] = None) -> list:
+        """Employees with the given ids, or every employee of a department"""
+
+    @abstractmethod
+    async def find_page(self, skip: int, limit: int, after: Optional[ObjectId] = None) -> list:
+        """Employees ordered by `_id`, starting after the `after` position"""
+
+    @abstractmethod
+    async def create(self, document: dict):
+        """Insert an employee, setting its `_id`; raises DuplicateError"""
+
+    @abstractmethod
+    async def create_many(self, documents: list) -> dict:
+        """Insert employees independently, setting their `_id`
+
+        Returns index -> StorageError for the documents that were rejected.
+        """
+
+    @abstractmethod
+    async def update(self, employee_id: str, fields: dict) -> Optional[dict]:
+        """Set fields on an employee and return its previous version
+
+        Raises DuplicateError when the new email is taken.
+        """
+
+    @abstractmethod
+    async def delete(self, params: dict) -> Optional[dict]:
+        """Delete the employees matching `{"employee_id": ...}` or `{"department": ...}`
+
+        The employees disappear from reads at once; their attendance may be
+        removed later. Returns the deletion job, or None when none matched.
+        """
+
+    @abstractmethod
+    async def search(self, query: str, limit: int) -> list:
+        """Employees with a key starting with the normalized query, most relevant first
+
+        See app/search.py for the keys and the ranking.
+        """
+
+    @abstractmethod
+    async def department_headcounts(self) -> list:
+        """`{"department", "employees"}` per department, by department name"""
+
+
+class AttendanceRepository(ABC):
+    """Attendance records, one per employee per day"""
+
+    @abstractmethod
+    async def get(self, record_id: ObjectId) -> Optional[dict]:
+        """Look up a record by `_id`"""
+
+    @abstractmethod
+    async def create(self, document: dict):
+        """Insert a record, setting its `_id`; raises DuplicateError for a marked day"""
+
+    @abstractmethod
+    async def create_many(self, documents: list) -> dict:
+        """Insert records independently, setting their `_id`
+
+        Returns index -> StorageError for the documents that were rejected.
+        """
+
+    @abstractmethod
+    async def find_page(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        after: Optional[tuple[datetime, ObjectId]] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list:
+        """Matching records ordered by (date, _id) descending, starting after `after`"""
+
+    @abstractmethod
+    def iter_export(
+        self,
+        employee_id: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> AsyncIterator[dict]:
+        """Stream matching records ordered by (date, _id) ascending"""
+
+    @abstractmethod
+    async def update_status(self, record_id: ObjectId, status: str) -> Optional[dict]:
+        """Change a record's status and return its previous version
+
+        Records of deleted employees may be left alone, returning None.
+        """
+
+    @abstractmethod
+    async def delete(self, record_id: ObjectId) -> Optional[dict]:
+        """Delete a record and return it
+
+        Records of deleted employees may be left alone, returning None.
+        """
+
+    @abstractmethod
+    async def recent(self, limit: int) -> list:
+        """The most recent records, newest first; `limit` is at least 1"""
+
+    @abstractmethod
+    async def summary(
+        self,
+        employee_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        """An employee's attendance summary with per-month breakdowns"""
+
+    @abstractmethod
+    async def totals(self) -> dict:
+        """Present/absent counts across all attendance"""
+
+    @abstractmethod
+    async def department_day(self, day: date) -> list:
+        """`{"department", "present", "absent"}` for one day, by department name"""
+
+    @abstractmethod
+    async def department_report_groups(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        bucket: Optional[str] = None,
+        department: Optional[str] = None,
+    ) -> list:
+        """`{"department", "period", "present", "absent"}` by department, then period
+
+        `period` is None without a bucket. Input of build_department_report.
+        """
+
+    @abstractmethod
+    async def propagate_snapshot(self, previous: dict, employee: dict):
+        """Copy an employee's changed name/department onto their records"""
+
+
+class JobRepository(ABC):
+    """Background jobs, such as employee deletions (see app/jobs.py)"""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Look up a job by id; None for unknown or malformed ids"""
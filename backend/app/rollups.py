@@ -0,0 +1,275 @@
+"""
+Incrementally maintained attendance rollups
+
+Every attendance write adjusts three small stores with ``$inc`` upserts:
+per-employee monthly counts, per-department daily counts and global totals.
+Summary and dashboard reads use these instead of scanning raw records.
+A record counts under the department snapshot it carries (see
+app/snapshots.py), so every delta is built from the record itself; one
+without a snapshot counts under no department, as the rebuild groups it.
+
+Rebuild from raw attendance (backfill or repair; convert string dates
+with ``python -m app.dates`` and backfill snapshots with
+``python -m app.snapshots`` first):
+    python -m app.rollups
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+from pymongo import UpdateOne
+from app.aggregations import DAY_KEY, MONTH_KEY, department_report_pipeline, summarize_counts
+from app.dates import iso_day
+from app.indexes import create_indexes
+from app.database import (
+    get_attendance_collection,
+    get_attendance_totals_collection,
+    get_daily_rollups_collection,
+    get_monthly_rollups_collection,
+    run_with_mongo,
+)
+
+TOTALS_ID = "all"
+
+
+def _counts(status: str, sign: int = 1):
+    """Present/absent increments for one record"""
+    return (sign, 0) if status == "Present" else (0, sign)
+
+
+async def apply_attendance_deltas(entries):
+    """Apply (employee_id, department, date, present, absent) count changes
+
+    Changes are merged per rollup document and written with one unordered
+    bulk write per rollup collection. Dates may be stored attendance dates;
+    rollups are keyed by their YYYY-MM-DD / YYYY-MM strings.
+    """
+    monthly = defaultdict(lambda: [0, 0])
+    daily = defaultdict(lambda: [0, 0])
+    totals = [0, 0]
+    for employee_id, department, day, present, absent in entries:
+        day = iso_day(day)
+        for counts in (monthly[(employee_id, day[:7])], daily[(department, day)], totals):
+            counts[0] += present
+            counts[1] += absent
+
+    def operations(rollups, key_fields):
+        return [
+            UpdateOne(
+                dict(zip(key_fields, key)),
+                {"$inc": {"present": present, "absent": absent}},
+                upsert=True,
+            )
+            for key, (present, absent) in rollups.items()
+            if present or absent
+        ]
+
+    writes = []
+    monthly_ops = operations(monthly, ("employee_id", "month"))
+    if monthly_ops:
+        writes.append(get_monthly_rollups_collection().bulk_write(monthly_ops, ordered=False))
+    daily_ops = operations(daily, ("department", "date"))
+    if daily_ops:
+        writes.append(get_daily_rollups_collection().bulk_write(daily_ops, ordered=False))
+    if totals[0] or totals[1]:
+        writes.append(get_attendance_totals_collection().update_one(
+            {"_id": TOTALS_ID},
+            {"$inc": {"present": totals[0], "absent": totals[1]}},
+            upsert=True,
+        ))
+    if writes:
+        await asyncio.gather(*writes)
+
+
+async def record_marked(record: dict):
+    """Count a newly marked attendance record"""
+    await apply_attendance_deltas([
+        (record["employee_id"], record.get("department"), record["date"], *_counts(record["status"])),
+    ])
+
+
+async def record_removed(record: dict):
+    """Uncount a deleted attendance record"""
+    await records_removed([record])
+
+
+async def record_status_changed(record: dict, new_status: str):
+    """Move a record (as it was before the change) between the present and absent counters"""
+    if record["status"] == new_status:
+        return
+    old_present, old_absent = _counts(record["status"], -1)
+    new_present, new_absent = _counts(new_status)
+    await apply_attendance_deltas([
+        (record["employee_id"], record.get("department"), record["date"],
+         old_present + new_present, old_absent + new_absent),
+    ])
+
+
+async def records_removed(records: list):
+    """Uncount a batch of deleted attendance records"""
+    await apply_attendance_deltas(
+        (record["employee_id"], record.get("department"), record["date"], *_counts(record["status"], -1))
+        for record in records
+    )
+
+
+async def drop_employee_rollups(employee_id: str):
+    """Delete the monthly rollups of an employee whose records are all gone"""
+    await get_monthly_rollups_collection().delete_many({"employee_id": employee_id})
+
+
+async def move_employee_rollups(employee_id: str, department: str):
+    """Move an employee's daily counts to their new department
+
+    Records not yet carrying the new department snapshot are uncounted
+    from the department they do carry, so records marked after the change
+    are not counted twice and older or missing snapshots stay exact.
+    """
+    attendance = get_attendance_collection()
+    cursor = await attendance.aggregate([
+        {"$match": {"employee_id": employee_id, "department": {"$ne": department}}},
+        {
+            "$group": {
+                "_id": {"department": "$department", "date": "$date", "status": "$status"},
+                "count": {"$sum": 1},
+            }
+        },
+    ])
+    entries = []
+    async for group in cursor:
+        key = group["_id"]
+        present, absent = _counts(key["status"], group["count"])
+        entries.append((employee_id, key.get("department"), key["date"], -present, -absent))
+        entries.append((employee_id, department, key["date"], present, absent))
+    await apply_attendance_deltas(entries)
+
+
+async def get_employee_monthly_rollups(
+    employee_id: str,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+):
+    """Monthly rollups of one employee, oldest first"""
+    filter_query = {"employee_id": employee_id}
+    month_filter = {}
+    if start_month:
+        month_filter["$gte"] = start_month
+    if end_month:
+        month_filter["$lte"] = end_month
+    if month_filter:
+        filter_query["month"] = month_filter
+    return await (
+        get_monthly_rollups_collection()
+        .find(filter_query, {"_id": 0, "month": 1, "present": 1, "absent": 1})
+        .sort("month", 1)
+        .to_list()
+    )
+
+
+async def get_department_daily_rollups(day: date):
+    """Per-department counts for one day"""
+    return await (
+        get_daily_rollups_collection()
+        .find({"date": day.isoformat()}, {"_id": 0, "department": 1, "present": 1, "absent": 1})
+        .sort("department", 1)
+        .to_list()
+    )
+
+
+async def get_department_report_groups(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: Optional[str] = None,
+    department: Optional[str] = None,
+):
+    """Per-department (and per-period) counts over a date range"""
+    cursor = await get_daily_rollups_collection().aggregate(
+        department_report_pipeline(start_date, end_date, bucket, department)
+    )
+    return await cursor.to_list()
+
+
+async def get_attendance_totals():
+    """Present/absent counts across all attendance"""
+    totals = await get_attendance_totals_collection().find_one({"_id": TOTALS_ID})
+    return totals or {"present": 0, "absent": 0}
+
+
+def build_rollup_summary(employee_id: str, rollups: list):
+    """Build the attendance summary response from monthly rollups"""
+    present_count = sum(rollup["present"] for rollup in rollups)
+    absent_count = sum(rollup["absent"] for rollup in rollups)
+    return {
+        "employee_id": employee_id,
+        **summarize_counts(present_count, absent_count),
+        "monthly": [
+            {"month": rollup["month"], **summarize_counts(rollup["present"], rollup["absent"])}
+            for rollup in rollups
+            if rollup["present"] or rollup["absent"]
+        ],
+    }
+
+
+def _status_count(status: str):
+    return {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}}
+
+
+async def rebuild_rollups():
+    """Recompute every rollup from the raw attendance records
+
+    Writes that happen while the rebuild runs may be lost, so run it during
+    a quiet period.
+    """
+    attendance = get_attendance_collection()
+
+    monthly = await attendance.aggregate([
+        {
+            "$group": {
+                "_id": {"employee_id": "$employee_id", "month": MONTH_KEY},
+                "present": _status_count("Present"),
+                "absent": _status_count("Absent"),
+            }
+        },
+        {"$project": {"_id": 0, "employee_id": "$_id.employee_id", "month": "$_id.month", "present": 1, "absent": 1}},
+        {"$out": get_monthly_rollups_collection().name},
+    ])
+    await monthly.close()
+
+    # Same attribution as the incremental path: the record's department
+    # snapshot. Records of tombstoned employees still count until their
+    # deletion job removes them, and uncounts them.
+    daily = await attendance.aggregate([
+        {
+            "$group": {
+                "_id": {"department": "$department", "date": DAY_KEY},
+                "present": _status_count("Present"),
+                "absent": _status_count("Absent"),
+            }
+        },
+        {"$project": {"_id": 0, "department": "$_id.department", "date": "$_id.date", "present": 1, "absent": 1}},
+        {"$out": get_daily_rollups_collection().name},
+    ])
+    await daily.close()
+
+    cursor = await attendance.aggregate([
+        {"$group": {"_id": None, "present": _status_count("Present"), "absent": _status_count("Absent")}},
+    ])
+    totals = await cursor.to_list()
+    present, absent = (totals[0]["present"], totals[0]["absent"]) if totals else (0, 0)
+    await get_attendance_totals_collection().replace_one(
+        {"_id": TOTALS_ID}, {"present": present, "absent": absent}, upsert=True
+    )
+
+    # $out keeps existing indexes but creates new collections without them
+    await create_indexes()
+
+
+async def main():
+    print("Rebuilding attendance rollups...")
+    await rebuild_rollups()
+    print("✓ Attendance rollups rebuilt")
+
+
+if __name__ == "__main__":
+    run_with_mongo(main)
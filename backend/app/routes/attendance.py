@@ -1,11 +1,25 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from bson.objectid import ObjectId
-from datetime import datetime, date
-from app.database import get_attendance_collection, get_employees_collection
+from datetime import date
+from functools import partial
+from typing import Optional
+from app.dates import day_start, utcnow
+from app.etags import cache_headers, collection_versions, not_modified
+from app.events import attendance_removed, event_bus, iter_event_stream
+from app.snapshots import employee_snapshot
+from app.exporters import EXPORT_MEDIA_TYPES, iter_attendance_export
+from app.pagination import attendance_cursor, attendance_cursor_position, fetch_page
+from app.repositories import AttendanceRepository, DuplicateError, EmployeeRepository
+from app.storage import get_attendance_repository, get_employee_repository
+from app.serialization import documents_response, encode_document
 from app.schemas.schemas import (
     AttendanceCreate,
+    AttendanceBulkCreate,
+    AttendanceBulkResponse,
     AttendanceUpdate,
     AttendanceResponse,
+    AttendanceSummaryResponse,
     ErrorResponse,
 )
 
@@ -20,51 +34,131 @@ router = APIRouter(
 
 
 @router.post("", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
-async def mark_attendance(attendance: AttendanceCreate):
+async def mark_attendance(
+    attendance: AttendanceCreate,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
     """Mark attendance for an employee"""
-    employees = get_employees_collection()
-    attendance_coll = get_attendance_collection()
-    
     # Check if employee exists
-    employee = employees.find_one({"employee_id": attendance.employee_id})
+    employee = await employees.get(attendance.employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{attendance.employee_id}' not found",
         )
     
-    # Check if attendance for this date already exists
-    existing = attendance_coll.find_one({
-        "employee_id": attendance.employee_id,
-        "date": attendance.date.isoformat(),
-    })
-    if existing:
+    attendance_data = attendance.model_dump()
+    attendance_data["date"] = day_start(attendance.date)
+    attendance_data.update(employee_snapshot(employee))
+    attendance_data["created_at"] = utcnow()
+    
+    # A second mark for the same employee and day is rejected as a duplicate
+    try:
+        await records.create(attendance_data)
+    except DuplicateError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Attendance for employee '{attendance.employee_id}' on {attendance.date} already marked",
         )
+    collection_versions.bump("attendance")
     
-    attendance_data = attendance.model_dump()
-    attendance_data["date"] = attendance.date.isoformat()
-    attendance_data["created_at"] = datetime.utcnow().isoformat()
-    
-    result = attendance_coll.insert_one(attendance_data)
+    # The inserted document is known locally; no need to read it back
+    record = encode_document(dict(attendance_data))
+    event_bus.publish("attendance.created", record)
+    return record
+
+
+@router.post("/bulk", response_model=AttendanceBulkResponse)
+async def mark_attendance_bulk(
+    bulk: AttendanceBulkCreate,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Mark attendance for a batch of employees (or a whole department) on one date"""
+    day = day_start(bulk.date)
+    
+    # Resolve target employees with a single query
+    if bulk.department:
+        found = await employees.select(department=bulk.department)
+        targets = [(emp["employee_id"], bulk.status) for emp in found]
+    else:
+        targets = [(item.employee_id, item.status or bulk.status) for item in bulk.records]
+        found = await employees.select(employee_ids=list({employee_id for employee_id, _ in targets}))
+    snapshots = {emp["employee_id"]: employee_snapshot(emp) for emp in found}
+    
+    results = []
+    documents = []
+    pending = []  # (result, document) pairs awaiting the bulk write
+    created_at = utcnow()
+    for employee_id, status_value in targets:
+        result = {"employee_id": employee_id, "status": status_value}
+        results.append(result)
+        if employee_id not in snapshots:
+            result["result"] = "not_found"
+            result["detail"] = f"Employee with ID '{employee_id}' not found"
+            continue
+        document = {
+            "employee_id": employee_id,
+            "date": day,
+            "status": status_value,
+            **snapshots[employee_id],
+            "created_at": created_at,
+        }
+        documents.append(document)
+        pending.append((result, document))
+    
+    # Duplicates are rejected individually without aborting the rest of the batch
+    write_errors = await records.create_many(documents) if documents else {}
+    
+    created = []
+    for index, (result, document) in enumerate(pending):
+        error = write_errors.get(index)
+        if error is None:
+            result["result"] = "created"
+            result["_id"] = str(document["_id"])
+            created.append(document)
+        elif isinstance(error, DuplicateError):
+            result["result"] = "conflict"
+            result["detail"] = f"Attendance for employee '{result['employee_id']}' on {bulk.date} already marked"
+        else:
+            result["result"] = "error"
+            result["detail"] = str(error)
+    
+    if created:
+        collection_versions.bump("attendance")
+    for document in created:
+        event_bus.publish("attendance.created", encode_document(dict(document)))
     
-    created_attendance = attendance_coll.find_one({"_id": result.inserted_id})
     return {
-        "_id": str(created_attendance["_id"]),
-        **{k: v for k, v in created_attendance.items() if k != "_id"},
+        "date": bulk.date.isoformat(),
+        "created": sum(1 for r in results if r["result"] == "created"),
+        "conflicts": sum(1 for r in results if r["result"] == "conflict"),
+        "not_found": sum(1 for r in results if r["result"] == "not_found"),
+        "results": results,
     }
 
 
 @router.get("", response_model=list[AttendanceResponse])
 async def get_all_attendance(
+    request: Request,
     employee_id: str = None, 
+    department: Optional[str] = None,
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
 ):
-    """Get attendance records with optional employee filter"""
-    attendance_coll = get_attendance_collection()
+    """Get attendance records with optional employee and department filters
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the
+    next page; unlike `skip`, its cost does not grow with page depth.
+    """
+    # An employee filter also depends on the employee still existing
+    etag, cached = not_modified(request, "attendance", *(("employees",) if employee_id else ()))
+    if cached:
+        return cached
     
     # Validate pagination parameters
     if skip < 0:
@@ -74,48 +168,105 @@ async def get_all_attendance(
     if limit > 1000:
         limit = 1000
     
-    # Build filter
-    filter_query = {}
     if employee_id:
-        employees = get_employees_collection()
-        employee = employees.find_one({"employee_id": employee_id})
+        employee = await employees.get(employee_id)
         if not employee:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employee with ID '{employee_id}' not found",
             )
-        filter_query["employee_id"] = employee_id
     
-    records = list(
-        attendance_coll.find(filter_query)
-        .sort("date", -1)
-        .skip(skip)
-        .limit(limit)
+    headers = cache_headers(etag)
+    find_records = partial(
+        records.find_page,
+        employee_id=employee_id,
+        department=department,
+    )
+    page = await fetch_page(
+        find_records, attendance_cursor_position, attendance_cursor, cursor, skip, limit, headers,
     )
     
-    return [
-        {
-            "_id": str(record["_id"]),
-            **{k: v for k, v in record.items() if k != "_id"},
-        }
-        for record in records
-    ]
+    return documents_response(page, headers)
+
+
+@router.get("/export")
+async def export_attendance(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    compress: bool = False,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Stream attendance records as NDJSON or CSV, optionally gzip-compressed
+
+    Rows are streamed from storage in batches and written straight to the
+    response, so exports of any size use constant memory.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date",
+        )
+    
+    rows = records.iter_export(
+        employee_id=employee_id,
+        department=department,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    
+    filename = f"attendance-export.{format}"
+    if compress:
+        filename += ".gz"
+    return StreamingResponse(
+        iter_attendance_export(rows, format, compress),
+        media_type="application/gzip" if compress else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/stream")
+async def stream_attendance_events(request: Request):
+    """Live attendance and employee changes as Server-Sent Events
+
+    Events are `attendance.created|updated|deleted` and
+    `employee.created|updated|deleted` with the changed document (or the
+    removed ids) as data. The stream opens with a `ready` event whose
+    `cluster_wide` flag says whether it carries writes handled by every
+    worker (EVENT_SOURCE=change_stream) or only this one. A `resync` event means events were missed and the
+    client should refetch; reconnecting with `Last-Event-ID` replays recent
+    events instead.
+    """
+    subscription, complete = event_bus.subscribe(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        iter_event_stream(subscription, complete),
+        media_type="text/event-stream",
+        # Keep proxies from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/employee/{employee_id}", response_model=list[AttendanceResponse])
 async def get_employee_attendance(
+    request: Request,
     employee_id: str,
     skip: int = 0,
     limit: int = 100,
-    start_date: str = None,
-    end_date: str = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
 ):
     """Get attendance records for a specific employee with optional date filter"""
-    employees = get_employees_collection()
-    attendance_coll = get_attendance_collection()
+    etag, cached = not_modified(request, "attendance", "employees")
+    if cached:
+        return cached
     
     # Check if employee exists
-    employee = employees.find_one({"employee_id": employee_id})
+    employee = await employees.get(employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -130,50 +281,38 @@ async def get_employee_attendance(
     if limit > 1000:
         limit = 1000
     
-    # Build filter
-    filter_query = {"employee_id": employee_id}
-    
-    if start_date or end_date:
-        date_filter = {}
-        if start_date:
-            try:
-                date_filter["$gte"] = start_date
-            except:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid start_date format. Use YYYY-MM-DD",
-                )
-        if end_date:
-            try:
-                date_filter["$lte"] = end_date
-            except:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid end_date format. Use YYYY-MM-DD",
-                )
-        if date_filter:
-            filter_query["date"] = date_filter
-    
-    records = list(
-        attendance_coll.find(filter_query)
-        .sort("date", -1)
-        .skip(skip)
-        .limit(limit)
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date",
+        )
+    
+    headers = cache_headers(etag)
+    find_records = partial(
+        records.find_page,
+        employee_id=employee_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    page = await fetch_page(
+        find_records, attendance_cursor_position, attendance_cursor, cursor, skip, limit, headers,
     )
     
-    return [
-        {
-            "_id": str(record["_id"]),
-            **{k: v for k, v in record.items() if k != "_id"},
-        }
-        for record in records
-    ]
+    return documents_response(page, headers)
 
 
 @router.get("/record/{record_id}", response_model=AttendanceResponse)
-async def get_attendance_record(record_id: str):
+async def get_attendance_record(
+    record_id: str,
+    request: Request,
+    response: Response,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
     """Get a specific attendance record"""
-    attendance_coll = get_attendance_collection()
+    etag, cached = not_modified(request, "attendance")
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
     
     if not ObjectId.is_valid(record_id):
         raise HTTPException(
@@ -181,106 +320,101 @@ async def get_attendance_record(record_id: str):
             detail="Invalid record ID format",
         )
     
-    record = attendance_coll.find_one({"_id": ObjectId(record_id)})
+    record = await records.get(ObjectId(record_id))
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attendance record not found",
         )
     
-    return {
-        "_id": str(record["_id"]),
-        **{k: v for k, v in record.items() if k != "_id"},
-    }
+    return encode_document(record)
 
 
 @router.put("/record/{record_id}", response_model=AttendanceResponse)
-async def update_attendance(record_id: str, attendance_update: AttendanceUpdate):
+async def update_attendance(
+    record_id: str,
+    attendance_update: AttendanceUpdate,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
     """Update an attendance record"""
-    attendance_coll = get_attendance_collection()
-    
     if not ObjectId.is_valid(record_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid record ID format",
         )
     
-    # Check if record exists
-    record = attendance_coll.find_one({"_id": ObjectId(record_id)})
-    if not record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Attendance record not found",
-        )
-    
     update_data = attendance_update.model_dump()
     
-    result = attendance_coll.update_one(
-        {"_id": ObjectId(record_id)},
-        {"$set": update_data}
-    )
-    
-    if result.matched_count == 0:
+    # The previous version is returned, so the response is built locally
+    record = await records.update_status(ObjectId(record_id), update_data["status"])
+    if record is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attendance record not found",
         )
+    collection_versions.bump("attendance")
     
-    updated_record = attendance_coll.find_one({"_id": ObjectId(record_id)})
-    return {
-        "_id": str(updated_record["_id"]),
-        **{k: v for k, v in updated_record.items() if k != "_id"},
-    }
+    updated = encode_document({
+        **record,
+        **update_data,
+    })
+    event_bus.publish("attendance.updated", updated)
+    return updated
 
 
 @router.delete("/record/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_attendance(record_id: str):
+async def delete_attendance(
+    record_id: str,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
     """Delete an attendance record"""
-    attendance_coll = get_attendance_collection()
-    
     if not ObjectId.is_valid(record_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid record ID format",
         )
     
-    result = attendance_coll.delete_one({"_id": ObjectId(record_id)})
+    record = await records.delete(ObjectId(record_id))
     
-    if result.deleted_count == 0:
+    if record is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attendance record not found",
         )
+    collection_versions.bump("attendance")
+    event_bus.publish("attendance.deleted", attendance_removed(record))
     
     return None
 
 
-@router.get("/summary/{employee_id}")
-async def get_attendance_summary(employee_id: str):
-    """Get attendance summary for an employee"""
-    employees = get_employees_collection()
-    attendance_coll = get_attendance_collection()
+@router.get("/summary/{employee_id}", response_model=AttendanceSummaryResponse)
+async def get_attendance_summary(
+    request: Request,
+    response: Response,
+    employee_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Get attendance summary for an employee, with per-month breakdowns"""
+    etag, cached = not_modified(request, "attendance", "employees")
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
     
     # Check if employee exists
-    employee = employees.find_one({"employee_id": employee_id})
+    employee = await employees.get(employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found",
         )
     
-    # Get all attendance records
-    records = list(attendance_coll.find({"employee_id": employee_id}))
-    
-    # Calculate summary
-    total_records = len(records)
-    present_count = len([r for r in records if r["status"] == "Present"])
-    absent_count = len([r for r in records if r["status"] == "Absent"])
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date",
+        )
     
-    return {
-        "employee_id": employee_id,
-        "total_records": total_records,
-        "present_days": present_count,
-        "absent_days": absent_count,
-        "attendance_percentage": round((present_count / total_records * 100), 2) if total_records > 0 else 0,
-    }
+    return await records.summary(employee_id, start_date, end_date)
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import time
+from fastapi import APIRouter, Depends, Query, Response
+from datetime import date
+from typing import Optional
+from dotenv import load_dotenv
+from app.aggregations import summarize_counts
+from app.repositories import AttendanceRepository, EmployeeRepository
+from app.serialization import encode_document
+from app.storage import get_attendance_repository, get_employee_repository
+from app.schemas.schemas import (
+    DashboardAttendanceResponse,
+    DashboardStatsResponse,
+    ErrorResponse,
+)
+
+load_dotenv()
+
+# Seconds a computed /dashboard/stats payload is reused
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "5"))
+
+# (day, recent) -> (expires_at, payload)
+_stats_cache = {}
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"],
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad request"},
+    },
+)
+
+
+@router.get("/attendance", response_model=DashboardAttendanceResponse)
+async def get_dashboard_attendance(
+    day: Optional[date] = None,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Attendance totals and per-department counts for a day, read from rollups"""
+    day = day or date.today()
+    
+    totals = await records.totals()
+    departments = await records.department_day(day)
+    
+    return {
+        "date": day.isoformat(),
+        "overall": summarize_counts(totals["present"], totals["absent"]),
+        "day": summarize_counts(
+            sum(rollup["present"] for rollup in departments),
+            sum(rollup["absent"] for rollup in departments),
+        ),
+        "departments": [
+            {"department": rollup["department"], **summarize_counts(rollup["present"], rollup["absent"])}
+            for rollup in departments
+            if rollup["present"] or rollup["absent"]
+        ],
+    }
+
+
+async def _recent_attendance(records: AttendanceRepository, limit: int):
+    """Most recent attendance records, newest first"""
+    if limit == 0:
+        # Not passed on: limit(0) means no limit to MongoDB
+        return []
+    return [encode_document(record) for record in await records.recent(limit)]
+
+
+@router.get("/stats", response_model=DashboardStatsResponse)
+async def get_dashboard_stats(
+    response: Response,
+    day: Optional[date] = None,
+    recent: int = Query(8, ge=0, le=100),
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Everything the dashboard page shows, in one request
+
+    The independent indexed reads run concurrently, so the endpoint costs a
+    single round trip of latency regardless of data size. Results are
+    cached in-process for DASHBOARD_CACHE_TTL_SECONDS.
+    """
+    day = day or date.today()
+    response.headers["Cache-Control"] = f"private, max-age={int(DASHBOARD_CACHE_TTL_SECONDS)}"
+    
+    key = (day, recent)
+    cached = _stats_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    departments, totals, day_rollups, recent_records = await asyncio.gather(
+        employees.department_headcounts(),
+        records.totals(),
+        records.department_day(day),
+        _recent_attendance(records, recent),
+    )
+    
+    payload = {
+        "date": day.isoformat(),
+        "total_employees": sum(group["employees"] for group in departments),
+        "departments": departments,
+        "overall": summarize_counts(totals["present"], totals["absent"]),
+        "day": summarize_counts(
+            sum(rollup["present"] for rollup in day_rollups),
+            sum(rollup["absent"] for rollup in day_rollups),
+        ),
+        "recent_attendance": recent_records,
+    }
+    
+    # Drop expired entries so the cache stays bounded
+    now = time.monotonic()
+    for stale in [k for k, (expires_at, _) in _stats_cache.items() if expires_at <= now]:
+        del _stats_cache[stale]
+    _stats_cache[key] = (now + DASHBOARD_CACHE_TTL_SECONDS, payload)
+    return payload
@@ -1,14 +1,31 @@
-from fastapi import APIRouter, HTTPException, status
-from bson.objectid import ObjectId
-from datetime import datetime
-from app.database import get_employees_collection, get_attendance_collection
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from typing import Optional
+from pydantic import ValidationError
+from app.dates import utcnow
+from app.etags import cache_headers, collection_versions, not_modified
+from app.events import event_bus
+from app.importers import ImportFormatError, detect_import_format, iter_import_records
+from app.pagination import employee_cursor, employee_cursor_position, fetch_page
+from app.repositories import AttendanceRepository, DuplicateError, EmployeeRepository
+from app.search import normalize
+from app.storage import get_attendance_repository, get_employee_repository
+from app.serialization import FastJSONResponse, documents_response, encode_document
 from app.schemas.schemas import (
     EmployeeCreate,
     EmployeeUpdate,
     EmployeeResponse,
+    EmployeeBatchRequest,
+    EmployeeBatchResponse,
+    EmployeeImportResponse,
     ErrorResponse,
+    JobResponse,
 )
 
+# Rows written per insert_many during an import
+IMPORT_BATCH_SIZE = 1000
+# Cap on per-row errors returned by an import
+MAX_IMPORT_ERRORS = 1000
+
 router = APIRouter(
     prefix="/employees",
     tags=["employees"],
@@ -20,43 +37,174 @@ router = APIRouter(
 
 
 @router.post("", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
-async def create_employee(employee: EmployeeCreate):
+async def create_employee(
+    employee: EmployeeCreate,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
     """Create a new employee"""
-    employees = get_employees_collection()
+    employee_data = employee.model_dump()
+    employee_data["created_at"] = employee_data["updated_at"] = utcnow()
     
-    # Check if employee_id already exists
-    existing = employees.find_one({"employee_id": employee.employee_id})
-    if existing:
+    # Uniqueness of employee_id and email is enforced by the repository
+    try:
+        await employees.create(employee_data)
+    except DuplicateError as exc:
+        if exc.field == "email":
+            detail = f"Employee with email '{employee.email}' already exists"
+        else:
+            detail = f"Employee with ID '{employee.employee_id}' already exists"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Employee with ID '{employee.employee_id}' already exists",
+            detail=detail,
         )
+    collection_versions.bump("employees")
+    
+    # The inserted document is known locally; no need to read it back
+    created = encode_document(dict(employee_data))
+    event_bus.publish("employee.created", created)
+    return created
+
+
+def _record_import_error(report: dict, row: int, employee_id: Optional[str], detail: str):
+    """Count a failed import row and keep its error if under the cap"""
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_IMPORT_ERRORS:
+        report["errors"].append({"row": row, "employee_id": employee_id, "detail": detail})
+    else:
+        report["errors_truncated"] = True
+
+
+async def _insert_import_batch(employees: EmployeeRepository, batch: list, report: dict):
+    """Write one batch of validated import rows with a single bulk insert"""
+    now = utcnow()
+    documents = []
+    rows = []
+    for row, employee in batch:
+        employee_data = employee.model_dump()
+        employee_data["created_at"] = now
+        employee_data["updated_at"] = now
+        documents.append(employee_data)
+        rows.append((row, employee.employee_id, employee.email))
     
-    # Check if email already exists
-    existing_email = employees.find_one({"email": employee.email})
-    if existing_email:
+    # Duplicate employee_id/email rows are rejected individually without
+    # aborting the rest of the batch
+    write_errors = await employees.create_many(documents)
+    
+    for index, error in write_errors.items():
+        row, employee_id, email = rows[index]
+        if not isinstance(error, DuplicateError):
+            detail = str(error)
+        elif error.field == "email":
+            detail = f"Employee with email '{email}' already exists"
+        else:
+            detail = f"Employee with ID '{employee_id}' already exists"
+        _record_import_error(report, row, employee_id, detail)
+    report["imported"] += len(documents) - len(write_errors)
+    if len(write_errors) < len(documents):
+        collection_versions.bump("employees")
+    for index, document in enumerate(documents):
+        if index not in write_errors:
+            event_bus.publish("employee.created", encode_document(document))
+
+
+@router.post("/import", response_model=EmployeeImportResponse)
+async def import_employees(
+    request: Request,
+    format: Optional[str] = None,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Bulk-create employees from a streamed CSV or NDJSON upload
+
+    The request body is parsed incrementally and written in batches, so
+    memory use does not depend on the size of the upload.
+    """
+    try:
+        import_format = detect_import_format(request.headers.get("content-type"), format)
+    except ImportFormatError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(exc),
+        )
+    
+    report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    batch = []
+    try:
+        async for row, record, error in iter_import_records(request.stream(), import_format):
+            report["total_rows"] += 1
+            if error:
+                _record_import_error(report, row, None, error)
+                continue
+            try:
+                employee = EmployeeCreate.model_validate(record)
+            except ValidationError as exc:
+                employee_id = record.get("employee_id") if isinstance(record, dict) else None
+                detail = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                    for err in exc.errors()
+                )
+                _record_import_error(report, row, employee_id, detail)
+                continue
+            batch.append((row, employee))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await _insert_import_batch(employees, batch, report)
+                batch = []
+    except ImportFormatError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Employee with email '{employee.email}' already exists",
+            detail=str(exc),
         )
     
-    employee_data = employee.model_dump()
-    employee_data["created_at"] = datetime.utcnow().isoformat()
-    employee_data["updated_at"] = datetime.utcnow().isoformat()
+    if batch:
+        await _insert_import_batch(employees, batch, report)
+    
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
+
+
+@router.post("/batch", response_model=EmployeeBatchResponse)
+async def get_employees_batch(
+    batch: EmployeeBatchRequest,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Get several employees by mixed Mongo `_id` / `employee_id` values
+
+    Results follow the request order; ids that match no employee are
+    returned with `found: false`.
+    """
+    found = await employees.get_many(batch.ids)
     
-    result = employees.insert_one(employee_data)
+    results = []
+    for value in batch.ids:
+        employee = found.get(value)
+        results.append({
+            "id": value,
+            "found": employee is not None,
+            # Copy: cached documents are shared and must keep their ObjectId
+            "employee": encode_document(dict(employee)) if employee else None,
+        })
     
-    created_employee = employees.find_one({"_id": result.inserted_id})
-    return {
-        "_id": str(created_employee["_id"]),
-        **{k: v for k, v in created_employee.items() if k != "_id"},
-    }
+    return FastJSONResponse(content={
+        "results": results,
+        "not_found": sum(1 for result in results if not result["found"]),
+    })
 
 
 @router.get("", response_model=list[EmployeeResponse])
-async def get_all_employees(skip: int = 0, limit: int = 100):
-    """Get all employees with pagination"""
-    employees = get_employees_collection()
+async def get_all_employees(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Get all employees with pagination
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the
+    next page; unlike `skip`, its cost does not grow with page depth.
+    """
+    etag, cached = not_modified(request, "employees")
+    if cached:
+        return cached
     
     # Validate pagination parameters
     if skip < 0:
@@ -66,63 +214,83 @@ async def get_all_employees(skip: int = 0, limit: int = 100):
     if limit > 1000:
         limit = 1000
     
-    employee_list = list(
-        employees.find().skip(skip).limit(limit)
+    headers = cache_headers(etag)
+    employee_list = await fetch_page(
+        employees.find_page, employee_cursor_position, employee_cursor, cursor, skip, limit, headers,
     )
     
-    return [
-        {
-            "_id": str(emp["_id"]),
-            **{k: v for k, v in emp.items() if k != "_id"},
-        }
-        for emp in employee_list
-    ]
+    return documents_response(employee_list, headers)
 
 
-@router.get("/{employee_id}", response_model=EmployeeResponse)
-async def get_employee(employee_id: str):
-    """Get a specific employee by ID"""
-    employees = get_employees_collection()
+# Registered before /{employee_id} so "search" is not taken for an employee id
+@router.get("/search", response_model=list[EmployeeResponse])
+async def search_employees(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Find employees by a case-insensitive prefix of their id, name, email or department
+
+    Matches are ranked by field (employee_id, name, email, department),
+    exact matches first; see app/search.py.
+    """
+    etag, cached = not_modified(request, "employees")
+    if cached:
+        return cached
     
-    # Try to find by MongoDB _id first
-    try:
-        if ObjectId.is_valid(employee_id):
-            employee = employees.find_one({"_id": ObjectId(employee_id)})
-            if employee:
-                return {
-                    "_id": str(employee["_id"]),
-                    **{k: v for k, v in employee.items() if k != "_id"},
-                }
-    except:
-        pass
-    
-    # Try to find by employee_id field
-    employee = employees.find_one({"employee_id": employee_id})
-    if not employee:
+    query = normalize(q)
+    if not query:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Employee with ID '{employee_id}' not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must not be empty",
         )
+    if limit < 1:
+        limit = 10
+    if limit > 50:
+        limit = 50
     
-    return {
-        "_id": str(employee["_id"]),
-        **{k: v for k, v in employee.items() if k != "_id"},
-    }
+    matches = await employees.search(query[:100], limit)
+    return documents_response(matches, cache_headers(etag))
 
 
-@router.put("/{employee_id}", response_model=EmployeeResponse)
-async def update_employee(employee_id: str, employee_update: EmployeeUpdate):
-    """Update an employee"""
-    employees = get_employees_collection()
+@router.get("/{employee_id}", response_model=EmployeeResponse)
+async def get_employee(
+    employee_id: str,
+    request: Request,
+    response: Response,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Get a specific employee by ID"""
+    etag, cached = not_modified(request, "employees")
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
     
-    # Find the employee
-    employee = employees.find_one({"employee_id": employee_id})
+    # Tried as a MongoDB _id first, then as an employee_id, in one lookup
+    employee = (await employees.get_many([employee_id])).get(employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found",
         )
     
+    return encode_document(dict(employee))
+
+
+@router.put("/{employee_id}", response_model=EmployeeResponse)
+async def update_employee(
+    employee_id: str,
+    employee_update: EmployeeUpdate,
+    background_tasks: BackgroundTasks,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+    attendance: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Update an employee
+
+    Name and department changes are copied onto the employee's attendance
+    records by a background task after the response is sent.
+    """
     # Prepare update data
     update_data = employee_update.model_dump(exclude_unset=True)
     if not update_data:
@@ -131,53 +299,93 @@ async def update_employee(employee_id: str, employee_update: EmployeeUpdate):
             detail="No fields to update",
         )
     
-    # Check if email is being updated and if it's already taken
-    if "email" in update_data:
-        existing_email = employees.find_one(
-            {"email": update_data["email"], "employee_id": {"$ne": employee_id}}
-        )
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Email '{update_data['email']}' is already in use",
-            )
-    
-    update_data["updated_at"] = datetime.utcnow().isoformat()
+    update_data["updated_at"] = utcnow()
     
-    result = employees.update_one(
-        {"employee_id": employee_id},
-        {"$set": update_data}
-    )
+    # The previous version comes back for the snapshot propagation
+    try:
+        previous = await employees.update(employee_id, update_data)
+    except DuplicateError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Email '{update_data['email']}' is already in use",
+        )
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found",
         )
     
-    updated_employee = employees.find_one({"employee_id": employee_id})
-    return {
-        "_id": str(updated_employee["_id"]),
-        **{k: v for k, v in updated_employee.items() if k != "_id"},
-    }
+    collection_versions.bump("employees")
+    updated_employee = {**previous, **update_data}
+    background_tasks.add_task(attendance.propagate_snapshot, previous, updated_employee)
+    
+    updated = encode_document(dict(updated_employee))
+    event_bus.publish("employee.updated", updated)
+    return updated
 
 
-@router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_employee(employee_id: str):
-    """Delete an employee"""
-    employees = get_employees_collection()
-    attendance = get_attendance_collection()
+async def _delete_employees(employees: EmployeeRepository, params: dict):
+    """Delete the matching employees and announce it
+
+    Returns the deletion job, or None when no active employee matched.
+    """
+    job = await employees.delete(params)
+    if job is not None:
+        collection_versions.bump("employees")
+        event_bus.publish("employee.deleted", params)
+    return job
+
+
+def _job_response(job: dict):
+    return encode_document(dict(job))
+
+
+@router.delete(
+    "/department/{department}",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def delete_department(
+    department: str,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Delete every employee of a department
+
+    Works like deleting a single employee: the employees are hidden at once
+    and a single background job removes them and their attendance.
+    """
+    job = await _delete_employees(employees, {"department": department})
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No employees found in department '{department}'",
+        )
     
-    # Find and delete the employee
-    result = employees.delete_one({"employee_id": employee_id})
+    return _job_response(job)
+
+
+@router.delete(
+    "/{employee_id}",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def delete_employee(
+    employee_id: str,
+    employees: EmployeeRepository = Depends(get_employee_repository),
+):
+    """Delete an employee
+
+    The employee is tombstoned and disappears from every read immediately;
+    their attendance is removed in batches by a background job, whose
+    progress is available at `GET /jobs/{job_id}`.
+    """
+    job = await _delete_employees(employees, {"employee_id": employee_id})
     
-    if result.deleted_count == 0:
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found",
         )
     
-    # Also delete all attendance records for this employee
-    attendance.delete_many({"employee_id": employee_id})
-    
-    return None
+    return _job_response(job)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.repositories import JobRepository
+from app.serialization import encode_document
+from app.storage import get_job_repository
+from app.schemas.schemas import ErrorResponse, JobResponse
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={
+        404: {"model": ErrorResponse, "description": "Job not found"},
+    },
+)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: str,
+    jobs: JobRepository = Depends(get_job_repository),
+):
+    """Get the status and progress of a background job"""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found",
+        )
+    
+    return encode_document(dict(job))
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date
+from typing import Optional
+from app.aggregations import build_department_report
+from app.repositories import AttendanceRepository
+from app.storage import get_attendance_repository
+from app.schemas.schemas import DepartmentReportResponse, ErrorResponse
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad request"},
+    },
+)
+
+
+@router.get("/departments", response_model=DepartmentReportResponse)
+async def get_department_report(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: Optional[str] = Query(None, pattern="^(week|month)$"),
+    department: Optional[str] = None,
+    records: AttendanceRepository = Depends(get_attendance_repository),
+):
+    """Attendance rate per department over a date range
+
+    Computed in one aggregation over the per-department daily rollups, so
+    the cost does not depend on the number of employees. With `bucket`,
+    each department also gets weekly (labelled by the Monday) or monthly
+    counts. Records count towards the employee's current department.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+    
+    groups = await records.department_report_groups(start_date, end_date, bucket, department)
+    
+    return {
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "bucket": bucket,
+        "departments": build_department_report(groups),
+    }
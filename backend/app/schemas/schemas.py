@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr, field_validator
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
 from typing import Optional
 from datetime import date
 
@@ -51,6 +51,40 @@ class EmployeeResponse(EmployeeBase):
         populate_by_name = True
 
 
+class EmployeeBatchRequest(BaseModel):
+    """Schema for fetching several employees at once"""
+    ids: list[str] = Field(..., min_length=1, max_length=500)
+
+
+class EmployeeBatchResult(BaseModel):
+    """Schema for one requested id of a batch fetch"""
+    id: str
+    found: bool
+    employee: Optional[EmployeeResponse] = None
+
+
+class EmployeeBatchResponse(BaseModel):
+    """Schema for batch fetch response, in request order"""
+    results: list[EmployeeBatchResult]
+    not_found: int
+
+
+class EmployeeImportError(BaseModel):
+    """Schema for one rejected row of an employee import"""
+    row: int
+    employee_id: Optional[str] = None
+    detail: str
+
+
+class EmployeeImportResponse(BaseModel):
+    """Schema for employee import response"""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: list[EmployeeImportError]
+    errors_truncated: bool = False
+
+
 class AttendanceBase(BaseModel):
     """Base schema for Attendance"""
     employee_id: str = Field(..., min_length=1)
@@ -83,12 +117,156 @@ class AttendanceUpdate(BaseModel):
 class AttendanceResponse(AttendanceBase):
     """Schema for attendance response"""
     id: str = Field(alias="_id")
+    full_name: Optional[str] = None
+    department: Optional[str] = None
     created_at: Optional[str] = None
 
     class Config:
         populate_by_name = True
 
 
+class AttendanceBulkItem(BaseModel):
+    """Schema for one employee in a bulk attendance request"""
+    employee_id: str = Field(..., min_length=1)
+    status: Optional[str] = Field(None, pattern="^(Present|Absent)$")
+
+
+class AttendanceBulkCreate(BaseModel):
+    """Schema for marking attendance for many employees on one date
+
+    Either list the employees in `records`, or give a `department` to mark
+    every employee in it with the default `status`.
+    """
+    date: date
+    status: Optional[str] = Field(None, pattern="^(Present|Absent)$")
+    department: Optional[str] = Field(None, min_length=1, max_length=100)
+    records: list[AttendanceBulkItem] = Field(default_factory=list, max_length=5000)
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if self.department and self.records:
+            raise ValueError('Provide either records or department, not both')
+        if not self.department and not self.records:
+            raise ValueError('Provide records or a department')
+        if self.department and not self.status:
+            raise ValueError('A default status is required when marking a department')
+        if not self.status and any(item.status is None for item in self.records):
+            raise ValueError('Every record needs a status when no default status is given')
+        return self
+
+
+class AttendanceBulkResult(BaseModel):
+    """Schema for the outcome of one item in a bulk attendance request"""
+    employee_id: str
+    result: str  # created | conflict | not_found | error
+    id: Optional[str] = Field(None, alias="_id")
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class AttendanceBulkResponse(BaseModel):
+    """Schema for bulk attendance response"""
+    date: str
+    created: int
+    conflicts: int
+    not_found: int
+    results: list[AttendanceBulkResult]
+
+
+class MonthlyAttendanceSummary(BaseModel):
+    """Schema for one month of an attendance summary"""
+    month: str
+    total_records: int
+    present_days: int
+    absent_days: int
+    attendance_percentage: float
+
+
+class AttendanceSummaryResponse(BaseModel):
+    """Schema for attendance summary response"""
+    employee_id: str
+    total_records: int
+    present_days: int
+    absent_days: int
+    attendance_percentage: float
+    monthly: list[MonthlyAttendanceSummary] = []
+
+
+class AttendanceCounts(BaseModel):
+    """Schema for present/absent counters"""
+    total_records: int
+    present_days: int
+    absent_days: int
+    attendance_percentage: float
+
+
+class DepartmentAttendanceCounts(AttendanceCounts):
+    """Schema for one department's attendance counters"""
+    department: str
+
+
+class DepartmentReportPeriod(AttendanceCounts):
+    """Schema for one week or month of a department report"""
+    period: str
+
+
+class DepartmentReport(DepartmentAttendanceCounts):
+    """Schema for one department's attendance over a report range"""
+    periods: list[DepartmentReportPeriod] = []
+
+
+class DepartmentReportResponse(BaseModel):
+    """Schema for department attendance report response"""
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    bucket: Optional[str] = None
+    departments: list[DepartmentReport]
+
+
+class JobResponse(BaseModel):
+    """Schema for background job status"""
+    id: str = Field(alias="_id")
+    kind: str
+    status: str  # pending | running | completed | failed
+    params: dict
+    progress: dict
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class DashboardAttendanceResponse(BaseModel):
+    """Schema for dashboard attendance response"""
+    date: str
+    overall: AttendanceCounts
+    day: AttendanceCounts
+    departments: list[DepartmentAttendanceCounts]
+
+
+class DepartmentHeadcount(BaseModel):
+    """Schema for one department's employee count"""
+    department: str
+    employees: int
+
+
+class DashboardStatsResponse(BaseModel):
+    """Schema for dashboard stats response"""
+    date: str
+    total_employees: int
+    departments: list[DepartmentHeadcount]
+    overall: AttendanceCounts
+    day: AttendanceCounts
+    recent_attendance: list[AttendanceResponse]
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses"""
     detail: str
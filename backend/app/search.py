@@ -0,0 +1,103 @@
+"""
+Employee search keys and ranking
+
+Each employee carries normalized prefix keys under ``search``: lowercased,
+whitespace-collapsed values of employee_id, full_name, email and
+department, plus the individual words of the name and department. Every
+key field has its own (key, _id) index, so a prefix lookup is a single
+index range scan and costs the same at 100 or 100k employees.
+
+A search reads the first `limit` matches of each field in index order and
+ranks them: employee_id matches first, then name, email and department;
+within a field by the matched key, so exact matches come first, and then
+by `_id`. The indexes are on (key, _id), so ranking within a field is
+exactly index order and the per-field candidates always contain the
+overall best `limit`, even when many employees share a key (e.g. a
+department). Both storage backends share this ranking.
+
+Add the keys to employees created before search existed:
+    python -m app.search
+"""
+
+from pymongo import UpdateOne
+from app.database import bulk_write_batches, get_employees_collection, run_with_mongo
+
+SEARCH_FIELD = "search"
+# Searched fields in relevance order
+SEARCH_FIELDS = ("employee_id", "full_name", "email", "department")
+# Fields whose individual words are also matched
+WORD_FIELDS = ("full_name", "department")
+# Prefix upper bound: sorts after every key starting with the prefix
+PREFIX_END = "\uffff"
+
+
+def normalize(value: str) -> str:
+    """Case- and whitespace-insensitive form of a searched value"""
+    return " ".join(value.casefold().split())
+
+
+def field_keys(field: str, value: str) -> list:
+    """Prefix keys of one searched field"""
+    normalized = normalize(value)
+    keys = [normalized]
+    if field in WORD_FIELDS:
+        keys.extend(word for word in dict.fromkeys(normalized.split()) if word != normalized)
+    return keys
+
+
+def search_keys(employee: dict) -> dict:
+    """The `search` subdocument stored with an employee"""
+    return {field: field_keys(field, employee[field]) for field in SEARCH_FIELDS}
+
+
+def search_updates(fields: dict) -> dict:
+    """`$set` entries refreshing the keys of the updated searchable fields"""
+    return {
+        f"{SEARCH_FIELD}.{field}": field_keys(field, value)
+        for field, value in fields.items()
+        if field in SEARCH_FIELDS
+    }
+
+
+def _relevance(employee: dict, query: str) -> tuple:
+    """Sort key of a matching employee; lower is more relevant
+
+    Ties break on `_id`, the second field of the search indexes.
+    """
+    best = None
+    for priority, field in enumerate(SEARCH_FIELDS):
+        for key in field_keys(field, employee[field]):
+            if key.startswith(query):
+                rank = (priority, key)
+                if best is None or rank < best:
+                    best = rank
+    if best is None:
+        # Keys written before a concurrent update; rank after every match
+        best = (len(SEARCH_FIELDS), "")
+    return (*best, employee["_id"])
+
+
+def rank_matches(candidates: list, query: str, limit: int) -> list:
+    """Deduplicate candidate employees and return the best `limit` of them"""
+    unique = {str(employee["_id"]): employee for employee in candidates}
+    return sorted(unique.values(), key=lambda employee: _relevance(employee, query))[:limit]
+
+
+async def backfill_search_keys() -> int:
+    """Write search keys for every employee that lacks them"""
+    employees = get_employees_collection()
+    cursor = employees.find({SEARCH_FIELD: {"$exists": False}}, {field: 1 for field in SEARCH_FIELDS})
+    updates = (
+        UpdateOne({"_id": employee["_id"]}, {"$set": {SEARCH_FIELD: search_keys(employee)}})
+        async for employee in cursor
+    )
+    return await bulk_write_batches(employees, updates)
+
+
+async def main():
+    modified = await backfill_search_keys()
+    print(f"✓ Added search keys to {modified} employees")
+
+
+if __name__ == "__main__":
+    run_with_mongo(main)
@@ -0,0 +1,80 @@
+"""
+Fast path for list responses
+
+List endpoints return documents straight from MongoDB. Instead of copying
+each one into a new dict and letting FastAPI validate it against the
+response model before encoding, the query projects only the response
+fields, ``_id`` and stored dates are converted in place, and the list is
+encoded in one call.
+Encoding uses orjson, a listed requirement; the standard library is only a
+fallback for installs without it.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.dates import iso_day, iso_timestamp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fields returned by the list endpoints; keep in step with the response models
+EMPLOYEE_PROJECTION = {
+    "employee_id": 1,
+    "full_name": 1,
+    "email": 1,
+    "department": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+ATTENDANCE_PROJECTION = {
+    "employee_id": 1,
+    "full_name": 1,
+    "department": 1,
+    "date": 1,
+    "status": 1,
+    "created_at": 1,
+}
+# Stored as midnight UTC dates, returned as YYYY-MM-DD
+DAY_FIELDS = ("date",)
+
+
+def encode_document(document: dict) -> dict:
+    """Convert a document's ObjectId and BSON dates to strings in place"""
+    document["_id"] = str(document["_id"])
+    for field, value in document.items():
+        if isinstance(value, datetime):
+            document[field] = iso_day(value) if field in DAY_FIELDS else iso_timestamp(value)
+    return document
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def documents_response(documents: list, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Serialize MongoDB documents for a list endpoint
+
+    Documents are already validated on write, so they are not passed through
+    the response model again; ObjectIds and dates are stringified in place.
+    """
+    for document in documents:
+        encode_document(document)
+    return FastJSONResponse(content=documents, headers=headers)
@@ -0,0 +1,134 @@
+"""
+Employee snapshots on attendance records
+
+Attendance documents carry a copy of the employee's ``full_name`` and
+``department`` so listings and department filters read a single
+collection. update_employee propagates changes in the background.
+
+Backfill records written before snapshots existed (or repair drift):
+    python -m app.snapshots
+"""
+
+import asyncio
+import contextvars
+from pymongo import UpdateMany
+from pymongo.errors import PyMongoError
+from app.cache import EMPLOYEE_CACHE_TTL_SECONDS
+from app.database import (
+    ACTIVE_EMPLOYEE_FILTER,
+    bulk_write_batches,
+    get_attendance_collection,
+    get_employees_collection,
+    run_with_mongo,
+)
+from app.etags import collection_versions
+from app.rollups import move_employee_rollups
+
+SNAPSHOT_FIELDS = ("full_name", "department")
+SNAPSHOT_PROJECTION = {field: 1 for field in SNAPSHOT_FIELDS}
+
+# Strong references to pending second passes so they are not garbage collected
+_pending_repairs = set()
+
+
+def employee_snapshot(employee: dict) -> dict:
+    """Employee fields copied onto each attendance record"""
+    return {field: employee[field] for field in SNAPSHOT_FIELDS}
+
+
+async def fill_missing_snapshots(records: list) -> list:
+    """Give records written before snapshots existed their employee's snapshot
+
+    Rollup deltas are keyed by a record's department, which such records
+    lack until ``python -m app.snapshots`` has run. They get what the
+    backfill would write: the employee's current values (or None once the
+    employee is gone, as the rollup rebuild groups them).
+    """
+    missing = {record["employee_id"] for record in records if "department" not in record}
+    if not missing:
+        return records
+    cursor = get_employees_collection().find(
+        {"employee_id": {"$in": list(missing)}}, {"employee_id": 1, **SNAPSHOT_PROJECTION}
+    )
+    employees = {employee["employee_id"]: employee async for employee in cursor}
+    for record in records:
+        if "department" not in record:
+            employee = employees.get(record["employee_id"])
+            record.update(employee_snapshot(employee) if employee else dict.fromkeys(SNAPSHOT_FIELDS))
+    return records
+
+
+def _stale_snapshot_update(employee: dict) -> UpdateMany:
+    """Update the employee's records whose snapshot differs from the employee"""
+    snapshot = employee_snapshot(employee)
+    return UpdateMany(
+        {
+            "employee_id": employee["employee_id"],
+            "$or": [{field: {"$ne": value}} for field, value in snapshot.items()],
+        },
+        {"$set": snapshot},
+    )
+
+
+async def propagate_employee_snapshot(previous: dict, employee: dict):
+    """Copy an employee's changed name/department onto their attendance
+
+    Runs as a background task after update_employee. A department change
+    also moves the records' counts between daily department rollups.
+    Other workers keep marking attendance from their cached copy of the
+    employee for up to EMPLOYEE_CACHE_TTL_SECONDS, so a second pass repairs
+    those records once the cached copies have expired.
+    """
+    if employee_snapshot(previous) == employee_snapshot(employee):
+        return
+    
+    await _repair_employee_snapshot(employee)
+    # Fresh context: the second pass is not part of the request (see app/metrics.py)
+    task = contextvars.Context().run(asyncio.create_task, _repair_after_cache_ttl(employee["employee_id"]))
+    _pending_repairs.add(task)
+    task.add_done_callback(_pending_repairs.discard)
+
+
+async def _repair_employee_snapshot(employee: dict):
+    """Bring one employee's records and their daily rollups in line with the employee"""
+    try:
+        await move_employee_rollups(employee["employee_id"], employee["department"])
+        result = await get_attendance_collection().bulk_write([_stale_snapshot_update(employee)])
+        if result.modified_count:
+            collection_versions.bump("attendance")
+    except PyMongoError as exc:
+        print(f"⚠ Could not propagate changes of employee {employee['employee_id']} to attendance: {exc}")
+
+
+async def _repair_after_cache_ttl(employee_id: str):
+    # One extra second for marks that read the cache just before it expired
+    await asyncio.sleep(EMPLOYEE_CACHE_TTL_SECONDS + 1)
+    try:
+        employee = await get_employees_collection().find_one(
+            {"employee_id": employee_id, **ACTIVE_EMPLOYEE_FILTER},
+            {"employee_id": 1, **SNAPSHOT_PROJECTION},
+        )
+    except PyMongoError as exc:
+        print(f"⚠ Could not propagate changes of employee {employee_id} to attendance: {exc}")
+        return
+    # A deleted employee's records are removed by its deletion job instead
+    if employee is not None:
+        await _repair_employee_snapshot(employee)
+
+
+async def backfill_attendance_snapshots():
+    """Bring every attendance record's snapshot in line with its employee"""
+    cursor = get_employees_collection().find(
+        {}, {"employee_id": 1, **SNAPSHOT_PROJECTION}
+    )
+    updates = (_stale_snapshot_update(employee) async for employee in cursor)
+    return await bulk_write_batches(get_attendance_collection(), updates)
+
+
+async def main():
+    modified = await backfill_attendance_snapshots()
+    print(f"✓ Updated employee snapshots on {modified} attendance records")
+
+
+if __name__ == "__main__":
+    run_with_mongo(main)
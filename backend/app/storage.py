@@ -0,0 +1,63 @@
+"""
+Storage backend selection
+
+STORAGE_BACKEND picks the repositories the routes are given:
+
+- ``mongodb`` (default): app/mongo_repository.py
+- ``memory``: app/memory_repository.py, no database needed; data is per
+  worker and lost on restart
+
+Routes take the repositories as FastAPI dependencies, so tests can also
+swap them with ``app.dependency_overrides``.
+"""
+
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from app.memory_repository import MemoryAttendanceRepository, MemoryEmployeeRepository, MemoryJobRepository, MemoryStore
+from app.mongo_repository import MongoAttendanceRepository, MongoEmployeeRepository, MongoJobRepository
+from app.repositories import AttendanceRepository, EmployeeRepository, JobRepository
+
+load_dotenv()
+
+STORAGE_BACKENDS = ("mongodb", "memory")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongodb")
+if STORAGE_BACKEND not in STORAGE_BACKENDS:
+    raise RuntimeError(f"STORAGE_BACKEND must be one of {', '.join(STORAGE_BACKENDS)}, not {STORAGE_BACKEND!r}")
+
+_repositories: Optional[tuple[EmployeeRepository, AttendanceRepository, JobRepository]] = None
+
+
+def uses_mongodb() -> bool:
+    return STORAGE_BACKEND == "mongodb"
+
+
+def _get_repositories() -> tuple[EmployeeRepository, AttendanceRepository, JobRepository]:
+    global _repositories
+    if _repositories is None:
+        if uses_mongodb():
+            _repositories = (MongoEmployeeRepository(), MongoAttendanceRepository(), MongoJobRepository())
+        else:
+            # The repositories share one store, like collections share a database
+            store = MemoryStore()
+            _repositories = (
+                MemoryEmployeeRepository(store),
+                MemoryAttendanceRepository(store),
+                MemoryJobRepository(store),
+            )
+    return _repositories
+
+
+def get_employee_repository() -> EmployeeRepository:
+    """FastAPI dependency: the configured employee repository"""
+    return _get_repositories()[0]
+
+
+def get_attendance_repository() -> AttendanceRepository:
+    """FastAPI dependency: the configured attendance repository"""
+    return _get_repositories()[1]
+
+
+def get_job_repository() -> JobRepository:
+    """FastAPI dependency: the configured job repository"""
+    return _get_repositories()[2]
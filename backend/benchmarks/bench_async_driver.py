@@ -0,0 +1,105 @@
+"""
+Concurrent-request throughput benchmark: blocking vs async MongoDB driver
+Run against a local mongod: python -m benchmarks.bench_async_driver
+
+"Before" reproduces the old handlers, which were declared ``async def`` but
+called the synchronous pymongo client and therefore blocked the event loop.
+"After" uses the AsyncMongoClient data layer from app/database.py.
+Each simulated request performs the employee existence check done by the
+attendance routes (a ``find_one`` on ``employee_id``).
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from pymongo import MongoClient, AsyncMongoClient
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+BENCH_DATABASE = os.getenv("BENCH_DATABASE_NAME", "hrms_lite_bench")
+SEED_EMPLOYEES = 1000
+
+
+def seed(sync_client):
+    """Populate the benchmark database with employees"""
+    employees = sync_client[BENCH_DATABASE]["employees"]
+    employees.drop()
+    employees.insert_many([
+        {
+            "employee_id": f"EMP{i:05d}",
+            "full_name": f"Employee {i}",
+            "email": f"employee{i}@example.com",
+            "department": f"Dept {i % 10}",
+        }
+        for i in range(SEED_EMPLOYEES)
+    ])
+    employees.create_index("employee_id", unique=True)
+
+
+async def run_blocking(sync_client, requests, concurrency):
+    """Old behaviour: sync pymongo calls inside async handlers"""
+    employees = sync_client[BENCH_DATABASE]["employees"]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler(i):
+        async with semaphore:
+            employees.find_one({"employee_id": f"EMP{i % SEED_EMPLOYEES:05d}"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+async def run_async(requests, concurrency):
+    """New behaviour: awaited queries on the async client"""
+    client = AsyncMongoClient(MONGODB_URL, maxPoolSize=concurrency)
+    employees = client[BENCH_DATABASE]["employees"]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler(i):
+        async with semaphore:
+            await employees.find_one({"employee_id": f"EMP{i % SEED_EMPLOYEES:05d}"})
+
+    # Warm up the pool so connection setup is not measured
+    await asyncio.gather(*(handler(i) for i in range(concurrency)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    args = parser.parse_args()
+
+    sync_client = MongoClient(MONGODB_URL)
+    seed(sync_client)
+
+    print(f"\n{'='*60}")
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14} {'speedup':>9}")
+    print(f"{'='*60}")
+    for concurrency in args.concurrency:
+        blocking = asyncio.run(run_blocking(sync_client, args.requests, concurrency))
+        async_ = asyncio.run(run_async(args.requests, concurrency))
+        blocking_rps = args.requests / blocking
+        async_rps = args.requests / async_
+        print(
+            f"{concurrency:>12} {blocking_rps:>16.0f} {async_rps:>14.0f} "
+            f"{async_rps / blocking_rps:>8.2f}x"
+        )
+    print(f"{'='*60}\n")
+
+    sync_client.drop_database(BENCH_DATABASE)
+    sync_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Employee import benchmark: stream a generated CSV/NDJSON file to the API
+Run after starting the server: python -m benchmarks.bench_employee_import
+
+The upload is generated on the fly and sent with chunked transfer encoding,
+so neither the client nor the server holds the whole file in memory.
+Imported employees are removed from the database afterwards.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://localhost:8000")
+MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "hrms_lite")
+ID_PREFIX = "BENCHIMP"
+ROWS_PER_CHUNK = 500
+
+
+def generate_rows(rows, import_format):
+    """Yield the upload body in chunks of encoded rows"""
+    if import_format == "csv":
+        yield b"employee_id,full_name,email,department\n"
+    chunk = []
+    for i in range(rows):
+        row = {
+            "employee_id": f"{ID_PREFIX}{i:07d}",
+            "full_name": f"Bench Employee {i}",
+            "email": f"bench.import.{i}@example.com",
+            "department": f"Dept {i % 25}",
+        }
+        if import_format == "csv":
+            chunk.append(",".join(row.values()))
+        else:
+            chunk.append(json.dumps(row))
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def cleanup():
+    """Remove employees created by the benchmark"""
+    client = MongoClient(MONGODB_URL)
+    client[DATABASE_NAME]["employees"].delete_many(
+        {"employee_id": {"$regex": f"^{ID_PREFIX}"}}
+    )
+    client.close()
+
+
+def run_import(rows, import_format):
+    """Upload one generated file and return (elapsed seconds, report)"""
+    url = urlparse(BASE_URL)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=3600)
+    content_type = "text/csv" if import_format == "csv" else "application/x-ndjson"
+
+    start = time.perf_counter()
+    connection.request(
+        "POST",
+        "/employees/import",
+        body=generate_rows(rows, import_format),
+        headers={"Content-Type": content_type},
+        encode_chunked=True,
+    )
+    response = connection.getresponse()
+    report = json.loads(response.read())
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], nargs="+", default=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"{'format':>8} {'rows':>9} {'imported':>9} {'failed':>7} {'seconds':>9} {'rows/s':>9}")
+    print(f"{'='*60}")
+    for import_format in args.format:
+        cleanup()
+        elapsed, report = run_import(args.rows, import_format)
+        print(
+            f"{import_format:>8} {report['total_rows']:>9} {report['imported']:>9} "
+            f"{report['failed']:>7} {elapsed:>9.2f} {report['total_rows'] / elapsed:>9.0f}"
+        )
+    print(f"{'='*60}\n")
+    cleanup()
+
+
+if __name__ == "__main__":
+    main()
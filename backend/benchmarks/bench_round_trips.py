@@ -0,0 +1,146 @@
+"""
+Per-endpoint database round-trip count and latency for mutation handlers
+Run against a local mongod: python -m benchmarks.bench_round_trips
+
+Calls the route handlers directly (no HTTP) against a throwaway database and
+counts the commands each call sends, using a pymongo command listener.
+Before the handlers were rebuilt around find-and-modify and locally built
+responses, create/mark cost a write plus a re-read and the updates cost an
+existence check, the write and a re-read.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "hrms_lite_bench")
+
+from fastapi import BackgroundTasks  # noqa: E402
+from pymongo import monitoring  # noqa: E402
+
+from app import database  # noqa: E402
+from app.cache import employee_cache  # noqa: E402
+from app.indexes import create_indexes  # noqa: E402
+from app.mongo_repository import MongoAttendanceRepository, MongoEmployeeRepository  # noqa: E402
+from app.routes.attendance import mark_attendance, update_attendance  # noqa: E402
+from app.routes.employees import create_employee, update_employee  # noqa: E402
+from app.schemas.schemas import (  # noqa: E402
+    AttendanceCreate,
+    AttendanceUpdate,
+    EmployeeCreate,
+    EmployeeUpdate,
+)
+
+# Commands that are not part of serving a request
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+
+async def measure(name, calls):
+    """Run each zero-argument coroutine factory and report commands and latency"""
+    commands = []
+    latencies = []
+    for call in calls:
+        before = counter.count
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+        commands.append(counter.count - before)
+    latencies.sort()
+    print(
+        f"{name:<20} {statistics.mean(commands):>10.2f} "
+        f"{latencies[len(latencies) // 2]:>9.2f} {statistics.mean(latencies):>9.2f}"
+    )
+
+
+async def run(iterations):
+    await database.connect_to_mongo()
+    await database.client.drop_database(database.DATABASE_NAME)
+    await create_indexes()
+    # Measure cold lookups so cache hits do not hide round trips
+    employee_cache.clear()
+    employees = MongoEmployeeRepository()
+    attendance = MongoAttendanceRepository()
+
+    ids = [f"BENCH{i:05d}" for i in range(iterations)]
+    records = []
+
+    print(f"\n{'='*54}")
+    print(f"{'handler':<20} {'commands':>10} {'p50 ms':>9} {'mean ms':>9}")
+    print(f"{'='*54}")
+
+    await measure("create_employee", [
+        lambda employee_id=employee_id: create_employee(EmployeeCreate(
+            employee_id=employee_id,
+            full_name=f"Bench {employee_id}",
+            email=f"{employee_id.lower()}@example.com",
+            department="Benchmarks",
+        ), employees)
+        for employee_id in ids
+    ])
+
+    await measure("update_employee", [
+        lambda employee_id=employee_id: update_employee(
+            employee_id, EmployeeUpdate(department="Benchmarks 2"), BackgroundTasks(), employees, attendance
+        )
+        for employee_id in ids
+    ])
+
+    async def mark(employee_id):
+        employee_cache.clear()
+        records.append(await mark_attendance(AttendanceCreate(
+            employee_id=employee_id, date="2024-01-15", status="Present"
+        ), employees, attendance))
+
+    await measure("mark_attendance", [
+        lambda employee_id=employee_id: mark(employee_id) for employee_id in ids
+    ])
+
+    async def update(record):
+        employee_cache.clear()
+        await update_attendance(record["_id"], AttendanceUpdate(status="Absent"), attendance)
+
+    await measure("update_attendance", [
+        lambda record=record: update(record) for record in records
+    ])
+
+    print(f"{'='*54}\n")
+
+    await database.client.drop_database(database.DATABASE_NAME)
+    await database.close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Serialization cost of a list response: response-model path vs fast path
+Run: python -m benchmarks.bench_serialization
+
+No database is needed. "Before" reproduces the old list handlers: each
+document is copied into a new dict, validated against the response model by
+FastAPI, dumped back to Python and encoded with the standard json module.
+"After" is app.serialization.documents_response, which converts ``_id`` in
+place and encodes the list in one call.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.schemas.schemas import AttendanceResponse, EmployeeResponse
+from app.serialization import documents_response, orjson
+
+
+def employee_documents(rows):
+    now = datetime.utcnow().isoformat()
+    return [
+        {
+            "_id": ObjectId(),
+            "employee_id": f"EMP{i:05d}",
+            "full_name": f"Employee {i}",
+            "email": f"employee{i}@example.com",
+            "department": f"Dept {i % 10}",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+def attendance_documents(rows):
+    now = datetime.utcnow().isoformat()
+    return [
+        {
+            "_id": ObjectId(),
+            "employee_id": f"EMP{i % 100:05d}",
+            "date": f"2024-01-{i % 28 + 1:02d}",
+            "status": "Present" if i % 3 else "Absent",
+            "created_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+def render_before(adapter, documents):
+    """Old path: rebuild, validate, dump and encode"""
+    content = [
+        {
+            "_id": str(doc["_id"]),
+            **{k: v for k, v in doc.items() if k != "_id"},
+        }
+        for doc in documents
+    ]
+    validated = adapter.validate_python(content)
+    payload = adapter.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def render_after(documents):
+    """New path: in-place _id conversion and a single encode"""
+    return documents_response(documents).body
+
+
+def timed(fn, make_documents, iterations):
+    timings = []
+    for _ in range(iterations):
+        # Fresh documents each time, as each request reads them from the driver
+        documents = make_documents()
+        start = time.perf_counter()
+        fn(documents)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"\nencoder: {'orjson' if orjson else 'json'}, rows per response: {args.rows}")
+    print(f"{'='*52}")
+    print(f"{'endpoint':<12} {'before p50 ms':>14} {'after p50 ms':>13} {'speedup':>9}")
+    print(f"{'='*52}")
+    for name, model, make in (
+        ("employees", EmployeeResponse, employee_documents),
+        ("attendance", AttendanceResponse, attendance_documents),
+    ):
+        adapter = TypeAdapter(list[model])
+        before = timed(
+            lambda docs: render_before(adapter, docs), lambda: make(args.rows), args.iterations
+        )
+        after = timed(render_after, lambda: make(args.rows), args.iterations)
+        print(f"{name:<12} {before:>14.2f} {after:>13.2f} {before / after:>8.1f}x")
+    print(f"{'='*52}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput benchmark: 1 worker vs N workers in production mode
+Run against a local mongod: python -m benchmarks.bench_workers
+
+For each worker count the API is launched with `run.py --prod` on a
+spare port, warmed up, and loaded with concurrent keep-alive clients.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.loadgen import run_load, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = "127.0.0.1"
+
+
+def wait_until_healthy(port: int, timeout: float = 30.0):
+    """Poll /health until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://{HOST}:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become healthy")
+
+
+def bench(workers: int, port: int, path: str, concurrency: int, duration: float):
+    """Launch the server with `workers` processes and measure throughput"""
+    server = subprocess.Popen(
+        [sys.executable, "run.py", "--prod", "--workers", str(workers), "--host", HOST, "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_healthy(port)
+        request = lambda i: ("GET", path, None)
+        asyncio.run(run_load(HOST, port, request, concurrency, duration=2))
+        return summarize(*asyncio.run(run_load(HOST, port, request, concurrency, duration=duration)))
+    finally:
+        # SIGTERM exercises the graceful shutdown path
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--path", default="/employees?limit=50")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"GET {args.path}  concurrency={args.concurrency}  duration={args.duration}s")
+    print(f"{'='*60}")
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for workers in args.workers:
+        result = bench(workers, args.port, args.path, args.concurrency, args.duration)
+        print(
+            f"{workers:>8} {result['rps']:>10.0f} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}"
+        )
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Minimal asyncio HTTP/1.1 load generator used by the benchmarks
+
+Keeps one keep-alive connection per virtual user and records per-request
+latency, so benchmarks need nothing beyond the standard library.
+"""
+
+import asyncio
+import json
+import math
+import time
+
+
+class HTTPConnection:
+    """A single keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+    async def request(self, method: str, path: str, body=None, headers=None):
+        """Send one request and return (status, headers, body bytes)"""
+        if self.writer is None:
+            await self.open()
+
+        payload = b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if body is not None:
+            payload = json.dumps(body).encode()
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, response_headers, data
+
+
+async def run_load(host, port, next_request, concurrency: int, duration: float = None, requests: int = None):
+    """Drive `concurrency` virtual users until `duration` seconds or `requests` total
+
+    `next_request(i)` returns (method, path, body) for request number i,
+    optionally followed by a dict of extra headers.
+    Returns (latencies in seconds, error count, elapsed seconds).
+    """
+    latencies = []
+    errors = 0
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def claim():
+        nonlocal issued
+        if requests is not None and issued >= requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        issued += 1
+        return issued - 1
+
+    async def user():
+        nonlocal errors
+        connection = HTTPConnection(host, port)
+        try:
+            while (i := claim()) is not None:
+                method, path, body, *extra = next_request(i)
+                start = time.perf_counter()
+                try:
+                    status, _, _ = await connection.request(method, path, body, *extra)
+                    # 4xx counts too: a rerun hitting conflicts is not a clean run
+                    if status >= 400:
+                        errors += 1
+                except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    await connection.close()
+                    continue
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction: float):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors: int, elapsed: float):
+    """Throughput and latency percentiles (milliseconds) for one run"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+    }
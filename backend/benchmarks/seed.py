@@ -0,0 +1,230 @@
+"""
+Synthetic dataset generator for the benchmark suite
+Run against a local mongod: python -m benchmarks.seed --employees 50000 --days 200
+
+Fills the benchmark database (BENCH_DATABASE_NAME, default hrms_lite_bench)
+with employees spread over departments and one attendance record per
+employee per weekday, then builds the indexes and rollups the API expects.
+The same arguments and --seed always produce the same data. The dataset
+parameters are stored in the `bench_metadata` collection for
+benchmarks.suite to read.
+
+With STORAGE_BACKEND=memory, benchmarks.suite loads the same dataset
+through the API of the server it launches instead (seed_through_api).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "hrms_lite_bench")
+
+from app import database  # noqa: E402
+from app.dates import day_start, utcnow  # noqa: E402
+from app.indexes import create_indexes  # noqa: E402
+from app.rollups import rebuild_rollups  # noqa: E402
+from app.search import SEARCH_FIELD, search_keys  # noqa: E402
+from benchmarks.loadgen import run_load  # noqa: E402
+
+METADATA_ID = "dataset"
+# Documents per insert_many, and insert_many calls in flight
+INSERT_BATCH_SIZE = 10000
+INSERT_CONCURRENCY = 4
+# Records per POST /attendance/bulk, and requests in flight, when seeding through the API
+BULK_SEED_SIZE = 5000
+API_SEED_CONCURRENCY = 8
+
+FIRST_NAMES = ("Asha", "Ben", "Chen", "Divya", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas")
+LAST_NAMES = ("Kumar", "Lopez", "Müller", "Nakamura", "Okafor", "Patel", "Quinn", "Rossi", "Singh", "Tanaka")
+
+
+def employee_id(index: int) -> str:
+    return f"EMP{index:07d}"
+
+
+def department_name(index: int) -> str:
+    return f"Dept {index:02d}"
+
+
+def weekdays(end: date, count: int) -> list:
+    """The last `count` weekdays up to and including `end`, oldest first"""
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def generate_employees(rng: random.Random, count: int, departments: int):
+    now = utcnow()
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "employee_id": employee_id(index),
+            "full_name": f"{first} {last} {index}",
+            "email": f"{first.lower()}.{index}@example.com",
+            "department": department_name(rng.randrange(departments)),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+def generate_attendance(rng: random.Random, employees: list, days: list, presence: float):
+    now = utcnow()
+    for day in days:
+        stored_day = day_start(day)
+        for employee in employees:
+            yield {
+                "employee_id": employee["employee_id"],
+                "date": stored_day,
+                "status": "Present" if rng.random() < presence else "Absent",
+                "full_name": employee["full_name"],
+                "department": employee["department"],
+                "created_at": now,
+            }
+
+
+async def insert_all(collection, documents, total: int):
+    """Insert a document stream in concurrent unordered batches"""
+    semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+    pending = set()
+    inserted = 0
+    start = time.perf_counter()
+
+    async def write(batch):
+        nonlocal inserted
+        try:
+            await collection.insert_many(batch, ordered=False)
+        finally:
+            semaphore.release()
+        inserted += len(batch)
+        if inserted % (INSERT_BATCH_SIZE * 50) < len(batch) or inserted == total:
+            rate = inserted / (time.perf_counter() - start)
+            print(f"  {collection.name}: {inserted:,}/{total:,} ({rate:,.0f} docs/s)")
+
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            await semaphore.acquire()
+            pending.add(asyncio.create_task(write(batch)))
+            pending = {task for task in pending if not task.done()}
+            batch = []
+    if batch:
+        await semaphore.acquire()
+        pending.add(asyncio.create_task(write(batch)))
+    await asyncio.gather(*pending)
+
+
+async def seed(args):
+    rng = random.Random(args.seed)
+    db = database.get_database()
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+
+    employees = list(generate_employees(rng, args.employees, args.departments))
+    days = weekdays(args.end_date, args.days)
+    print(f"Seeding {len(employees):,} employees and {len(employees) * len(days):,} attendance records")
+
+    start = time.perf_counter()
+    # Insert copies with search keys: the driver adds _id to the documents it writes
+    await insert_all(
+        database.get_employees_collection(),
+        ({**e, SEARCH_FIELD: search_keys(e)} for e in employees),
+        len(employees),
+    )
+    await insert_all(
+        database.get_attendance_collection(),
+        generate_attendance(rng, employees, days, args.presence),
+        len(employees) * len(days),
+    )
+    print("Building indexes and rollups...")
+    await create_indexes()
+    await rebuild_rollups()
+
+    metadata = dataset_metadata(args, days)
+    await db["bench_metadata"].replace_one({"_id": METADATA_ID}, metadata, upsert=True)
+    print(f"✓ Seeded {database.DATABASE_NAME} in {time.perf_counter() - start:.0f}s")
+    return metadata
+
+
+def dataset_metadata(args, days: list) -> dict:
+    return {
+        "employees": args.employees,
+        "departments": args.departments,
+        "days": args.days,
+        "attendance": args.employees * len(days),
+        "start_date": days[0].isoformat(),
+        "end_date": days[-1].isoformat(),
+        "presence": args.presence,
+        "seed": args.seed,
+    }
+
+
+async def seed_through_api(host: str, port: int, args) -> dict:
+    """Load the dataset into an empty server through its API
+
+    Employees are created one request each and attendance is marked with
+    bulk requests of up to BULK_SEED_SIZE records, so a server on the memory
+    backend gets the same data as seed() writes to MongoDB.
+    """
+    rng = random.Random(args.seed)
+    employees = list(generate_employees(rng, args.employees, args.departments))
+    days = weekdays(args.end_date, args.days)
+    print(f"Seeding {len(employees):,} employees and {len(employees) * len(days):,} attendance records")
+
+    start = time.perf_counter()
+    fields = ("employee_id", "full_name", "email", "department")
+    bodies = [{field: employee[field] for field in fields} for employee in employees]
+    _, errors, _ = await run_load(
+        host, port, lambda i: ("POST", "/employees", bodies[i]), API_SEED_CONCURRENCY, requests=len(bodies),
+    )
+
+    # Same records (and random statuses) as seed(), one bulk request per day chunk
+    batches = []
+    records = generate_attendance(rng, employees, days, args.presence)
+    for day in days:
+        day_records = [
+            {"employee_id": record["employee_id"], "status": record["status"]}
+            for record in (next(records) for _ in employees)
+        ]
+        for offset in range(0, len(day_records), BULK_SEED_SIZE):
+            batches.append({"date": day.isoformat(), "records": day_records[offset:offset + BULK_SEED_SIZE]})
+    _, bulk_errors, _ = await run_load(
+        host, port, lambda i: ("POST", "/attendance/bulk", batches[i]), API_SEED_CONCURRENCY, requests=len(batches),
+    )
+    if errors or bulk_errors:
+        raise RuntimeError(f"Seeding failed: {errors + bulk_errors} request(s) rejected")
+    print(f"✓ Seeded the server in {time.perf_counter() - start:.0f}s")
+    return dataset_metadata(args, days)
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60, help="weekdays of attendance per employee")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 6, 30))
+    parser.add_argument("--presence", type=float, default=0.9, help="share of Present records")
+
+
+async def main(args):
+    await database.connect_to_mongo()
+    try:
+        await seed(args)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_dataset_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,410 @@
+"""
+Load-test suite: latency percentiles and throughput per route profile
+Run after benchmarks.seed: python -m benchmarks.suite --output bench-results.json
+
+Each profile drives one realistic traffic pattern (morning check-in burst,
+dashboard polling, deep pagination, summaries, ...) with concurrent
+keep-alive clients and records p50/p95/p99 latency and requests/sec. The
+results, the dataset parameters and the git commit are written as JSON;
+pass an earlier file with --compare to see the change per profile.
+
+By default the API is launched with `run.py --prod` against the benchmark
+database; use --no-launch to load a server that is already running on it.
+Write profiles mark days after the seeded range and clear them first, so
+the suite can be rerun on the same dataset.
+
+With STORAGE_BACKEND=memory no MongoDB is needed: the suite launches a
+single worker on the in-memory backend and seeds it through the API with
+the benchmarks.seed dataset options (--employees, --days, ...):
+    STORAGE_BACKEND=memory python -m benchmarks.suite --employees 1000 --days 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "hrms_lite_bench")
+
+from app import database  # noqa: E402
+from app.dates import day_start  # noqa: E402
+from app.rollups import apply_attendance_deltas  # noqa: E402
+from benchmarks.bench_workers import BACKEND_DIR, HOST, wait_until_healthy  # noqa: E402
+from benchmarks.loadgen import HTTPConnection, run_load, summarize  # noqa: E402
+from benchmarks.seed import (  # noqa: E402
+    FIRST_NAMES,
+    LAST_NAMES,
+    METADATA_ID,
+    add_dataset_arguments,
+    department_name,
+    employee_id,
+    seed_through_api,
+)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongodb")
+
+# Increment when profiles change in a way that makes old results incomparable
+SUITE_VERSION = 1
+# Pages walked ahead of the pagination profiles to collect cursors
+CURSOR_PAGES = 200
+
+
+@dataclass
+class Profile:
+    description: str
+    concurrency: int
+    # async (context) -> (next_request, request limit or None for duration-bound)
+    prepare: Callable
+    warmup: bool = True
+
+
+async def clear_day(day: date):
+    """Delete a day's attendance written by an earlier run, keeping the rollups in step"""
+    if STORAGE_BACKEND == "memory":
+        # Every run seeds a fresh server
+        return
+    attendance = database.get_attendance_collection()
+    records = await attendance.find(
+        {"date": day_start(day)}, {"employee_id": 1, "department": 1, "date": 1, "status": 1}
+    ).to_list()
+    if not records:
+        return
+    await attendance.delete_many({"date": day_start(day)})
+    await apply_attendance_deltas(
+        (record["employee_id"], record["department"], record["date"],
+         -int(record["status"] == "Present"), -int(record["status"] == "Absent"))
+        for record in records
+    )
+
+
+async def collect_cursors(context, path: str, pages: int) -> list:
+    """Walk a listing sequentially and return the cursor of every page"""
+    connection = HTTPConnection(HOST, context["port"])
+    cursors = []
+    try:
+        next_path = path
+        while len(cursors) < pages:
+            status, headers, _ = await connection.request("GET", next_path)
+            cursor = headers.get("x-next-cursor")
+            if status != 200 or not cursor:
+                break
+            cursors.append(cursor)
+            next_path = f"{path}&cursor={cursor}"
+    finally:
+        await connection.close()
+    return cursors
+
+
+def random_employee(context, rng: random.Random) -> str:
+    return employee_id(rng.randrange(context["dataset"]["employees"]))
+
+
+async def checkin_burst(context, rng):
+    """Every employee marks today's attendance once"""
+    day = context["first_free_day"]
+    await clear_day(day)
+    order = list(range(min(context["dataset"]["employees"], context["max_writes"])))
+    rng.shuffle(order)
+
+    def next_request(i):
+        body = {"employee_id": employee_id(order[i]), "date": day.isoformat(),
+                "status": "Present" if rng.random() < 0.9 else "Absent"}
+        return "POST", "/attendance", body
+
+    return next_request, len(order)
+
+
+async def bulk_checkin(context, rng):
+    """Team leads mark 100 employees at a time"""
+    day = context["first_free_day"] + timedelta(days=1)
+    await clear_day(day)
+    employees = min(context["dataset"]["employees"], context["max_writes"])
+
+    def next_request(i):
+        ids = range(i * 100, min((i + 1) * 100, employees))
+        body = {"date": day.isoformat(), "status": "Present",
+                "records": [{"employee_id": employee_id(index)} for index in ids]}
+        return "POST", "/attendance/bulk", body
+
+    return next_request, (employees + 99) // 100
+
+
+async def dashboard_polling(context, rng):
+    """Many open dashboards refreshing stats and today's counts"""
+    day = context["dataset"]["end_date"]
+
+    def next_request(i):
+        if i % 2:
+            return "GET", f"/dashboard/attendance?day={day}", None
+        return "GET", "/dashboard/stats?recent=8", None
+
+    return next_request, None
+
+
+async def employee_pages_skip(context, rng):
+    """Deep employee pages with skip/limit"""
+    pages = max(1, context["dataset"]["employees"] // 50)
+    return lambda i: ("GET", f"/employees?limit=50&skip={rng.randrange(pages) * 50}", None), None
+
+
+async def employee_pages_cursor(context, rng):
+    """Deep employee pages with keyset cursors"""
+    cursors = await collect_cursors(context, "/employees?limit=50", CURSOR_PAGES)
+    return lambda i: ("GET", f"/employees?limit=50&cursor={rng.choice(cursors)}", None), None
+
+
+async def attendance_pages_skip(context, rng):
+    """Deep attendance pages with skip/limit"""
+    return lambda i: ("GET", f"/attendance?limit=100&skip={rng.randrange(CURSOR_PAGES) * 100}", None), None
+
+
+async def attendance_pages_cursor(context, rng):
+    """Deep attendance pages with keyset cursors"""
+    cursors = await collect_cursors(context, "/attendance?limit=100", CURSOR_PAGES)
+    return lambda i: ("GET", f"/attendance?limit=100&cursor={rng.choice(cursors)}", None), None
+
+
+async def employee_attendance(context, rng):
+    """An employee's latest attendance page"""
+    return lambda i: ("GET", f"/attendance/employee/{random_employee(context, rng)}?limit=100", None), None
+
+
+async def summaries_rollup(context, rng):
+    """Whole-history summaries, answered from monthly rollups"""
+    return lambda i: ("GET", f"/attendance/summary/{random_employee(context, rng)}", None), None
+
+
+async def summaries_range(context, rng):
+    """Summaries over arbitrary day ranges, aggregated from raw records"""
+    start = date.fromisoformat(context["dataset"]["start_date"])
+    span = (date.fromisoformat(context["dataset"]["end_date"]) - start).days
+
+    def next_request(i):
+        first = start + timedelta(days=rng.randrange(max(1, span - 30)) + 3)
+        path = (f"/attendance/summary/{random_employee(context, rng)}"
+                f"?start_date={first}&end_date={first + timedelta(days=27)}")
+        return "GET", path, None
+
+    return next_request, None
+
+
+async def department_reports(context, rng):
+    """Monthly department report over the whole range"""
+    dataset = context["dataset"]
+    path = (f"/reports/departments?start_date={dataset['start_date']}"
+            f"&end_date={dataset['end_date']}&bucket=month")
+    return lambda i: ("GET", path, None), None
+
+
+async def employee_lookup(context, rng):
+    """Single employee reads"""
+    return lambda i: ("GET", f"/employees/{random_employee(context, rng)}", None), None
+
+
+async def employee_search(context, rng):
+    """Type-ahead searches: short prefixes of names, ids, emails and departments"""
+    def next_request(i):
+        prefix = rng.choice((
+            rng.choice(FIRST_NAMES)[:rng.randint(1, 4)],
+            rng.choice(LAST_NAMES)[:rng.randint(2, 5)],
+            random_employee(context, rng)[:rng.randint(4, 10)],
+            rng.choice(FIRST_NAMES).lower() + ".",
+            department_name(rng.randrange(context["dataset"]["departments"])),
+        ))
+        return "GET", f"/employees/search?q={quote(prefix)}&limit=10", None
+
+    return next_request, None
+
+
+async def employee_batch(context, rng):
+    """Batched reads of 100 employees"""
+    def next_request(i):
+        return "POST", "/employees/batch", {"ids": [random_employee(context, rng) for _ in range(100)]}
+
+    return next_request, None
+
+
+async def conditional_polling(context, rng):
+    """Employee list polls revalidated with If-None-Match"""
+    connection = HTTPConnection(HOST, context["port"])
+    try:
+        _, headers, _ = await connection.request("GET", "/employees?limit=50")
+    finally:
+        await connection.close()
+    etag = {"If-None-Match": headers.get("etag", "")}
+    return lambda i: ("GET", "/employees?limit=50", None, etag), None
+
+
+async def employee_export(context, rng):
+    """Streamed CSV export of one employee's history"""
+    return lambda i: ("GET", f"/attendance/export?format=csv&employee_id={random_employee(context, rng)}", None), None
+
+
+PROFILES = {
+    "checkin_burst": Profile("POST /attendance, each employee once", 100, checkin_burst, warmup=False),
+    "bulk_checkin": Profile("POST /attendance/bulk, 100 records each", 8, bulk_checkin, warmup=False),
+    "dashboard_polling": Profile("GET /dashboard/stats + /dashboard/attendance", 200, dashboard_polling),
+    "employee_pages_skip": Profile("GET /employees deep pages, skip", 32, employee_pages_skip),
+    "employee_pages_cursor": Profile("GET /employees deep pages, cursor", 32, employee_pages_cursor),
+    "attendance_pages_skip": Profile("GET /attendance deep pages, skip", 32, attendance_pages_skip),
+    "attendance_pages_cursor": Profile("GET /attendance deep pages, cursor", 32, attendance_pages_cursor),
+    "employee_attendance": Profile("GET /attendance/employee/{id}", 64, employee_attendance),
+    "summaries_rollup": Profile("GET /attendance/summary/{id}", 64, summaries_rollup),
+    "summaries_range": Profile("GET /attendance/summary/{id} with day range", 64, summaries_range),
+    "department_reports": Profile("GET /reports/departments?bucket=month", 16, department_reports),
+    "employee_lookup": Profile("GET /employees/{id}", 64, employee_lookup),
+    "employee_search": Profile("GET /employees/search, type-ahead prefixes", 64, employee_search),
+    "employee_batch": Profile("POST /employees/batch, 100 ids", 32, employee_batch),
+    "conditional_polling": Profile("GET /employees with If-None-Match", 64, conditional_polling),
+    "employee_export": Profile("GET /attendance/export?employee_id=", 16, employee_export),
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_profiles(args, dataset: dict) -> dict:
+    end_date = date.fromisoformat(dataset["end_date"])
+    context = {
+        "port": args.port,
+        "dataset": dataset,
+        "max_writes": args.max_writes,
+        "first_free_day": end_date + timedelta(days=1),
+    }
+    results = {}
+    for name in args.profiles:
+        profile = PROFILES[name]
+        # Seeded per profile so a profile's requests do not depend on the others
+        rng = random.Random(f"{args.seed}:{name}")
+        next_request, limit = await profile.prepare(context, rng)
+        if profile.warmup:
+            await run_load(HOST, args.port, next_request, profile.concurrency, duration=1)
+        latencies, errors, elapsed = await run_load(
+            HOST, args.port, next_request, profile.concurrency,
+            duration=None if limit else args.duration, requests=limit,
+        )
+        results[name] = {
+            "description": profile.description,
+            "concurrency": profile.concurrency,
+            **summarize(latencies, errors, elapsed),
+        }
+        result = results[name]
+        print(
+            f"{name:<24} {result['rps']:>9.0f} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}"
+        )
+    return results
+
+
+def print_comparison(baseline: dict, current: dict):
+    """Change in throughput and p95 latency against an earlier run"""
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('started_at')})")
+    print(f"{'profile':<24} {'req/s':>10} {'p95':>10}")
+    for name, result in current["profiles"].items():
+        before = baseline.get("profiles", {}).get(name)
+        if not before or not before["rps"] or not before["p95_ms"]:
+            continue
+        rps = (result["rps"] - before["rps"]) / before["rps"] * 100
+        p95 = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"{name:<24} {rps:>+9.1f}% {p95:>+9.1f}%")
+    if baseline.get("dataset") != current["dataset"]:
+        print("⚠ Datasets differ; numbers are not directly comparable")
+    if baseline.get("storage", "mongodb") != current["storage"]:
+        print("⚠ Storage backends differ; numbers are not directly comparable")
+
+
+async def main(args):
+    memory = STORAGE_BACKEND == "memory"
+    if memory:
+        if not args.launch:
+            raise SystemExit("STORAGE_BACKEND=memory: the suite must launch and seed its own server")
+        # Each worker would have its own empty store
+        args.workers = 1
+    else:
+        await database.connect_to_mongo()
+    server = None
+    try:
+        if not memory:
+            dataset = await database.get_database()["bench_metadata"].find_one({"_id": METADATA_ID})
+            if dataset is None:
+                raise SystemExit(f"No dataset in {database.DATABASE_NAME}; run python -m benchmarks.seed first")
+            dataset.pop("_id")
+
+        if args.launch:
+            server = subprocess.Popen(
+                [sys.executable, "run.py", "--prod", "--workers", str(args.workers),
+                 "--host", HOST, "--port", str(args.port)],
+                cwd=BACKEND_DIR,
+                env={**os.environ, "ACCESS_LOG": "false"},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            await asyncio.to_thread(wait_until_healthy, args.port)
+        if memory:
+            dataset = await seed_through_api(HOST, args.port, args)
+
+        report = {
+            "suite_version": SUITE_VERSION,
+            "commit": git_commit(),
+            "started_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "storage": STORAGE_BACKEND,
+            "workers": args.workers if args.launch else None,
+            "duration": args.duration,
+            "dataset": dataset,
+        }
+        print(f"\n{'='*70}")
+        print(f"{dataset['employees']:,} employees, {dataset['attendance']:,} attendance records")
+        print(f"{'='*70}")
+        print(f"{'profile':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        report["profiles"] = await run_profiles(args, dataset)
+        print(f"{'='*70}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+        if not memory:
+            await database.close_mongo_connection()
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"✓ Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as baseline:
+            print_comparison(json.load(baseline), report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per read profile")
+    parser.add_argument("--max-writes", type=int, default=20000, help="cap on records per write profile")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--no-launch", dest="launch", action="store_false",
+                        help="load a server already running on --port")
+    parser.add_argument("--seed", type=int, default=42)
+    # Dataset to seed with STORAGE_BACKEND=memory (see benchmarks.seed)
+    add_dataset_arguments(parser)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    asyncio.run(main(parser.parse_args()))
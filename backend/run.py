@@ -1,14 +1,114 @@
-import uvicorn
+"""
+Entry point for the HRMS Lite API
+
+Development (single process, auto-reload):
+    python run.py
+
+Production (one worker per CPU, no reload):
+    python run.py --prod [--workers N]
+    APP_ENV=production python run.py
+"""
+
+import argparse
+import asyncio
+import importlib.util
 import os
+import uvicorn
 from dotenv import load_dotenv
 
 load_dotenv()
 
-if __name__ == "__main__":
+
+def default_workers():
+    """Worker count from WEB_CONCURRENCY, otherwise one per CPU"""
+    return int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+def best_loop():
+    """Use uvloop when it is installed"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def best_http():
+    """Use httptools when it is installed"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+async def prepare_database():
+    """Create indexes once in the parent process before workers start"""
+    from app.database import connect_to_mongo, close_mongo_connection
+    from app.indexes import create_indexes
+
+    await connect_to_mongo()
+    try:
+        await create_indexes()
+    finally:
+        await close_mongo_connection()
+
+
+def warn_per_worker_events(workers: int):
+    """Events and ETag versions are per worker unless a change stream shares writes"""
+    if workers > 1 and os.getenv("EVENT_SOURCE", "local") != "change_stream":
+        max_age = os.getenv("ETAG_MAX_AGE_SECONDS", "5")
+        print(
+            f"⚠ {workers} workers with EVENT_SOURCE=local: a worker may answer 304 for up to "
+            f"{max_age}s (ETAG_MAX_AGE_SECONDS) after another worker's write"
+        )
+        print(
+            f"⚠ {workers} workers with EVENT_SOURCE=local: /attendance/stream only carries "
+            f"the writes its own worker handled"
+        )
+        print("⚠ Set EVENT_SOURCE=change_stream to follow every write")
+
+
+def run_production(host: str, port: int, workers: int):
+    """Serve with multiple worker processes tuned for throughput"""
+    if os.getenv("STORAGE_BACKEND", "mongodb") == "memory":
+        if workers > 1:
+            print(f"⚠ {workers} workers with STORAGE_BACKEND=memory: each worker has its own data")
+    else:
+        warn_per_worker_events(workers)
+        asyncio.run(prepare_database())
+        # Workers inherit this and skip the index build in their lifespan hook;
+        # each worker still opens its own MongoDB client after it starts
+        os.environ["CREATE_INDEXES_ON_STARTUP"] = "false"
+
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=best_loop(),
+        http=best_http(),
+        log_level=os.getenv("LOG_LEVEL", "info"),
+        access_log=os.getenv("ACCESS_LOG", "false").lower() == "true",
+        proxy_headers=True,
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_TIMEOUT", "5")),
+        # Stop accepting connections, then let in-flight requests finish
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")),
+    )
+
+
+def run_development(host: str, port: int):
+    """Serve a single auto-reloading process"""
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=host,
+        port=port,
         reload=True,
         log_level="info",
     )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the HRMS Lite API")
+    parser.add_argument("--prod", action="store_true", help="run in production mode")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (production only)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+
+    if args.prod or os.getenv("APP_ENV", "development").lower() == "production":
+        run_production(args.host, args.port, args.workers or default_workers())
+    else:
+        run_development(args.host, args.port)
@@ -0,0 +1,64 @@
+"""
+Shared fixtures: the API served by the in-memory storage backend
+
+Every test gets a fresh, empty store, so tests need neither MongoDB nor
+cleanup. Run from backend/: python -m pytest
+"""
+
+import os
+
+# Before the app is imported: app.storage reads it at import time
+os.environ["STORAGE_BACKEND"] = "memory"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.memory_repository import (  # noqa: E402
+    MemoryAttendanceRepository,
+    MemoryEmployeeRepository,
+    MemoryJobRepository,
+    MemoryStore,
+)
+from app.routes import dashboard  # noqa: E402
+from app.storage import get_attendance_repository, get_employee_repository, get_job_repository  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """Test client of an API backed by an empty in-memory store"""
+    store = MemoryStore()
+    employees, records, jobs = MemoryEmployeeRepository(store), MemoryAttendanceRepository(store), MemoryJobRepository(store)
+    app.dependency_overrides[get_employee_repository] = lambda: employees
+    app.dependency_overrides[get_attendance_repository] = lambda: records
+    app.dependency_overrides[get_job_repository] = lambda: jobs
+    dashboard._stats_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def create_employee(client):
+    """Create an employee, returning the response body"""
+    def create(employee_id: str, full_name: str = "Test Employee", department: str = "Engineering", email=None):
+        response = client.post("/employees", json={
+            "employee_id": employee_id,
+            "full_name": full_name,
+            "email": email or f"{employee_id.lower()}@example.com",
+            "department": department,
+        })
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create
+
+
+@pytest.fixture
+def mark(client):
+    """Mark one day of attendance, returning the response body"""
+    def mark_day(employee_id: str, day: str, status: str = "Present"):
+        response = client.post("/attendance", json={"employee_id": employee_id, "date": day, "status": status})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return mark_day
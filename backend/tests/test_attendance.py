@@ -0,0 +1,144 @@
+"""Marking, bulk marking, keyset pagination, date ranges and summaries"""
+
+from datetime import date, timedelta
+
+
+def walk(client, path: str, **params) -> list:
+    """Follow X-Next-Cursor from the first page to the last"""
+    seen, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        seen += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return seen
+
+
+def test_mark_rejects_duplicates_and_unknown_employees(client, create_employee, mark):
+    create_employee("E1", "Ann Lee", "Engineering")
+    record = mark("E1", "2024-03-01")
+    assert (record["date"], record["status"], record["department"]) == ("2024-03-01", "Present", "Engineering")
+
+    again = client.post("/attendance", json={"employee_id": "E1", "date": "2024-03-01", "status": "Absent"})
+    assert again.status_code == 400
+    unknown = client.post("/attendance", json={"employee_id": "NOPE", "date": "2024-03-01", "status": "Present"})
+    assert unknown.status_code == 404
+
+
+def test_bulk_marking_reports_each_item(client, create_employee, mark):
+    create_employee("E1")
+    create_employee("E2")
+    mark("E2", "2024-03-01")
+
+    response = client.post("/attendance/bulk", json={
+        "date": "2024-03-01",
+        "status": "Present",
+        "records": [
+            {"employee_id": "E1", "status": "Absent"},
+            {"employee_id": "E2"},
+            {"employee_id": "NOPE"},
+        ],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["conflicts"], body["not_found"]) == (1, 1, 1)
+    assert [(item["employee_id"], item["result"]) for item in body["results"]] == [
+        ("E1", "created"), ("E2", "conflict"), ("NOPE", "not_found"),
+    ]
+    assert client.get(f"/attendance/record/{body['results'][0]['_id']}").json()["status"] == "Absent"
+
+
+def test_bulk_marking_a_department(client, create_employee):
+    create_employee("E1", department="Sales")
+    create_employee("E2", department="Sales")
+    create_employee("E3", department="Ops")
+
+    body = client.post("/attendance/bulk", json={"date": "2024-03-01", "status": "Absent", "department": "Sales"}).json()
+    assert body["created"] == 2
+    assert sorted(item["employee_id"] for item in body["results"]) == ["E1", "E2"]
+    assert client.post("/attendance/bulk", json={"date": "2024-03-01", "status": "Absent"}).status_code == 422
+
+
+def test_cursor_pages_match_the_full_listing(client, create_employee):
+    for index in range(4):
+        create_employee(f"E{index}", department="Sales" if index % 2 else "Ops")
+    for offset in range(6):
+        client.post("/attendance/bulk", json={
+            "date": (date(2024, 3, 1) + timedelta(days=offset)).isoformat(),
+            "status": "Present",
+            "department": "Sales" if offset % 3 else "Ops",
+        })
+        client.post("/attendance", json={
+            "employee_id": "E0" if offset % 3 else "E1",
+            "date": (date(2024, 3, 1) + timedelta(days=offset)).isoformat(),
+            "status": "Absent",
+        })
+
+    for filters in ({}, {"department": "Sales"}, {"employee_id": "E1"}):
+        everything = client.get("/attendance", params={"limit": 1000, **filters}).json()
+        paged = walk(client, "/attendance", limit=5, **filters)
+        assert [record["_id"] for record in paged] == [record["_id"] for record in everything]
+        assert len({record["_id"] for record in paged}) == len(paged) > 5
+        assert [record["date"] for record in paged] == sorted((record["date"] for record in paged), reverse=True)
+        for key, value in filters.items():
+            assert all(record[key] == value for record in paged)
+
+    assert client.get("/attendance", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_employee_attendance_date_range(client, create_employee, mark):
+    create_employee("E1")
+    for day in ("2024-02-28", "2024-03-01", "2024-03-15", "2024-03-31", "2024-04-01"):
+        mark("E1", day)
+
+    def dates(**params):
+        return [record["date"] for record in walk(client, "/attendance/employee/E1", limit=2, **params)]
+
+    assert dates(start_date="2024-03-01", end_date="2024-03-31") == ["2024-03-31", "2024-03-15", "2024-03-01"]
+    assert dates(start_date="2024-03-16") == ["2024-04-01", "2024-03-31"]
+    assert dates(end_date="2024-02-28") == ["2024-02-28"]
+    bad_range = client.get("/attendance/employee/E1", params={"start_date": "2024-04-01", "end_date": "2024-03-01"})
+    assert bad_range.status_code == 400
+    assert client.get("/attendance/employee/NOPE").status_code == 404
+
+
+def test_summary_over_aligned_and_partial_months(client, create_employee, mark):
+    create_employee("E1")
+    mark("E1", "2024-02-29", "Absent")
+    mark("E1", "2024-03-01")
+    mark("E1", "2024-03-02", "Absent")
+    mark("E1", "2024-03-31")
+    mark("E1", "2024-04-02")
+
+    whole = client.get("/attendance/summary/E1").json()
+    assert (whole["total_records"], whole["present_days"], whole["absent_days"]) == (5, 3, 2)
+    assert whole["attendance_percentage"] == 60.0
+    assert [(month["month"], month["total_records"]) for month in whole["monthly"]] == [
+        ("2024-02", 1), ("2024-03", 3), ("2024-04", 1),
+    ]
+
+    march = client.get("/attendance/summary/E1", params={"start_date": "2024-03-01", "end_date": "2024-03-31"}).json()
+    assert (march["total_records"], march["present_days"], march["absent_days"]) == (3, 2, 1)
+
+    partial = client.get("/attendance/summary/E1", params={"start_date": "2024-03-02", "end_date": "2024-04-02"}).json()
+    assert (partial["total_records"], partial["present_days"], partial["absent_days"]) == (3, 2, 1)
+    assert [month["month"] for month in partial["monthly"]] == ["2024-03", "2024-04"]
+
+    bad_range = client.get("/attendance/summary/E1", params={"start_date": "2024-04-01", "end_date": "2024-03-01"})
+    assert bad_range.status_code == 400
+
+
+def test_update_and_delete_a_record(client, create_employee, mark):
+    create_employee("E1")
+    record = mark("E1", "2024-03-01")
+
+    updated = client.put(f"/attendance/record/{record['_id']}", json={"status": "Absent"})
+    assert updated.status_code == 200
+    assert updated.json()["status"] == "Absent"
+    assert client.get("/attendance/summary/E1").json()["absent_days"] == 1
+
+    assert client.delete(f"/attendance/record/{record['_id']}").status_code == 204
+    assert client.get(f"/attendance/record/{record['_id']}").status_code == 404
+    assert client.get("/attendance/summary/E1").json()["total_records"] == 0
+    assert client.get("/attendance/record/not-an-id").status_code == 400
@@ -0,0 +1,69 @@
+"""Employee and department deletion jobs, dashboard and report totals"""
+
+
+def test_delete_employee_removes_their_attendance(client, create_employee, mark):
+    create_employee("E1", department="Sales")
+    create_employee("E2", department="Sales")
+    for day in ("2024-03-01", "2024-03-02", "2024-03-03"):
+        mark("E1", day)
+        mark("E2", day, "Absent")
+
+    response = client.delete("/employees/E1")
+    assert response.status_code == 202
+    job = response.json()
+    # The in-memory backend runs the job before responding
+    assert (job["kind"], job["status"]) == ("employee_deletion", "completed")
+    assert client.get(f"/jobs/{job['_id']}").json()["status"] == "completed"
+
+    assert client.get("/employees/E1").status_code == 404
+    assert client.get("/attendance", params={"limit": 1000}).json() == client.get(
+        "/attendance/employee/E2", params={"limit": 1000},
+    ).json()
+    stats = client.get("/dashboard/stats", params={"day": "2024-03-01"}).json()
+    assert stats["total_employees"] == 1
+    assert (stats["overall"]["present_days"], stats["overall"]["absent_days"]) == (0, 3)
+    assert stats["day"]["total_records"] == 1
+
+
+def test_delete_department(client, create_employee, mark):
+    create_employee("E1", department="Sales")
+    create_employee("E2", department="Sales")
+    create_employee("E3", department="Ops")
+    for employee_id in ("E1", "E2", "E3"):
+        mark(employee_id, "2024-03-01")
+
+    job = client.delete("/employees/department/Sales").json()
+    assert job["status"] == "completed"
+    assert [employee["employee_id"] for employee in client.get("/employees").json()] == ["E3"]
+    assert [record["employee_id"] for record in client.get("/attendance").json()] == ["E3"]
+
+    assert client.delete("/employees/department/Sales").status_code == 404
+    assert client.get("/jobs/000000000000000000000000").status_code == 404
+
+
+def test_dashboard_and_report_follow_writes(client, create_employee, mark):
+    create_employee("E1", department="Sales")
+    create_employee("E2", department="Ops")
+    mark("E1", "2024-03-01")
+    mark("E2", "2024-03-01", "Absent")
+    record = mark("E1", "2024-03-02")
+
+    stats = client.get("/dashboard/stats", params={"day": "2024-03-01", "recent": 2}).json()
+    assert stats["total_employees"] == 2
+    assert sorted((group["department"], group["employees"]) for group in stats["departments"]) == [
+        ("Ops", 1), ("Sales", 1),
+    ]
+    assert stats["overall"]["total_records"] == 3
+    assert stats["day"]["attendance_percentage"] == 50.0
+    assert [recent["date"] for recent in stats["recent_attendance"]] == ["2024-03-02", "2024-03-01"]
+    assert client.get("/dashboard/stats", params={"recent": 0}).json()["recent_attendance"] == []
+
+    client.put(f"/attendance/record/{record['_id']}", json={"status": "Absent"})
+    day = client.get("/dashboard/attendance", params={"day": "2024-03-02"}).json()
+    assert (day["day"]["present_days"], day["day"]["absent_days"]) == (0, 1)
+    assert day["overall"]["absent_days"] == 2
+
+    report = client.get("/reports/departments", params={"bucket": "month"}).json()
+    by_department = {group["department"]: group for group in report["departments"]}
+    assert (by_department["Sales"]["present_days"], by_department["Sales"]["absent_days"]) == (1, 1)
+    assert [period["period"] for period in by_department["Ops"]["periods"]] == ["2024-03"]
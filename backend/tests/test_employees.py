@@ -0,0 +1,189 @@
+"""Employee CRUD, duplicates, batch reads, import, pagination and search"""
+
+
+def test_create_get_update_employee(client, create_employee):
+    created = create_employee("E1", "Ann Lee")
+    assert created["employee_id"] == "E1"
+    assert created["created_at"] == created["updated_at"]
+
+    by_employee_id = client.get("/employees/E1")
+    by_object_id = client.get(f"/employees/{created['_id']}")
+    assert by_employee_id.status_code == by_object_id.status_code == 200
+    assert by_employee_id.json() == by_object_id.json() == created
+
+    updated = client.put("/employees/E1", json={"department": "Sales"})
+    assert updated.status_code == 200
+    assert updated.json()["department"] == "Sales"
+    assert client.get("/employees/E1").json()["department"] == "Sales"
+
+
+def test_missing_employee(client):
+    assert client.get("/employees/NOPE").status_code == 404
+    assert client.put("/employees/NOPE", json={"full_name": "X"}).status_code == 404
+    assert client.delete("/employees/NOPE").status_code == 404
+
+
+def test_duplicate_employee_id_and_email(client, create_employee):
+    create_employee("E1", email="one@example.com")
+    create_employee("E2", email="two@example.com")
+
+    same_id = client.post("/employees", json={
+        "employee_id": "E1", "full_name": "X", "email": "new@example.com", "department": "D",
+    })
+    assert same_id.status_code == 400
+    assert "ID 'E1'" in same_id.json()["detail"]
+
+    same_email = client.post("/employees", json={
+        "employee_id": "E3", "full_name": "X", "email": "one@example.com", "department": "D",
+    })
+    assert same_email.status_code == 400
+    assert "email" in same_email.json()["detail"]
+
+    taken = client.put("/employees/E2", json={"email": "one@example.com"})
+    assert taken.status_code == 400
+    assert client.get("/employees/E2").json()["email"] == "two@example.com"
+
+
+def test_batch_keeps_request_order(client, create_employee):
+    first = create_employee("E1")
+    create_employee("E2")
+
+    response = client.post("/employees/batch", json={"ids": ["E2", "MISSING", first["_id"]]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [(result["id"], result["found"]) for result in body["results"]] == [
+        ("E2", True), ("MISSING", False), (first["_id"], True),
+    ]
+    assert body["results"][2]["employee"]["employee_id"] == "E1"
+    assert body["not_found"] == 1
+
+
+def test_csv_import_reports_rejected_rows(client, create_employee):
+    create_employee("E1", email="taken@example.com")
+    csv = (
+        "employee_id,full_name,email,department\n"
+        "I1,Imported One,i1@example.com,Sales\n"
+        "E1,Same Id,other@example.com,Sales\n"
+        "I2,Same Email,taken@example.com,Sales\n"
+        "I3,,i3@example.com,Sales\n"
+        "I4,Imported Four,i4@example.com,Sales\n"
+    )
+    response = client.post("/employees/import", content=csv, headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (5, 2, 3)
+    assert sorted(error["employee_id"] for error in report["errors"]) == ["E1", "I2", "I3"]
+    assert client.get("/employees/I4").status_code == 200
+
+
+def test_csv_import_quoting(client):
+    csv = (
+        "employee_id,full_name,email,department\n"
+        'Q1,Pat O"Brien,q1@example.com,Eng\n'
+        'Q2,"Lee, Multi\nLine",q2@example.com,Eng\n'
+        "Q3,Sam Roe,q3@example.com,Eng\n"
+    )
+    report = client.post("/employees/import", content=csv, headers={"content-type": "text/csv"}).json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (3, 3, 0)
+    assert client.get("/employees/Q1").json()["full_name"] == 'Pat O"Brien'
+
+    unterminated = "employee_id,full_name,email,department\n" + 'Q4,"Open,q4@example.com,Eng\n' + "".join(
+        f"R{index},Row {index},r{index}@example.com,Eng\n" for index in range(150)
+    )
+    report = client.post("/employees/import", content=unterminated, headers={"content-type": "text/csv"}).json()
+    assert report["errors"][0] == {"row": 1, "employee_id": None, "detail": "Unterminated quoted field"}
+    assert report["imported"] == 150
+
+
+def test_ndjson_import(client):
+    body = "\n".join([
+        '{"employee_id": "N1", "full_name": "One", "email": "n1@example.com", "department": "Ops"}',
+        '{"employee_id": "N2", "full_name": "Two", "email": "n2@example.com", "department": "Ops"}',
+    ])
+    response = client.post("/employees/import", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.json()["imported"] == 2
+    assert client.post("/employees/import", content="x", headers={"content-type": "text/plain"}).status_code == 415
+
+
+def test_cursor_pages_cover_every_employee_once(client, create_employee):
+    for index in range(23):
+        create_employee(f"E{index:02d}")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/employees", params=params)
+        assert response.status_code == 200
+        seen += [employee["employee_id"] for employee in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"E{index:02d}" for index in range(23)]
+    skipped = client.get("/employees", params={"skip": 20, "limit": 5}).json()
+    assert [employee["employee_id"] for employee in skipped] == ["E20", "E21", "E22"]
+    assert client.get("/employees", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_conditional_get(client, create_employee):
+    create_employee("E1")
+    first = client.get("/employees")
+    etag = first.headers["etag"]
+    assert client.get("/employees", headers={"If-None-Match": etag}).status_code == 304
+
+    create_employee("E2")
+    assert client.get("/employees", headers={"If-None-Match": etag}).status_code == 200
+
+
+def search(client, query: str, **params) -> list:
+    response = client.get("/employees/search", params={"q": query, **params})
+    assert response.status_code == 200, response.text
+    return [employee["employee_id"] for employee in response.json()]
+
+
+def test_search_matches_prefixes_of_each_field(client, create_employee):
+    create_employee("E1", "Ann Lee", "Engineering", "lee@example.com")
+    create_employee("E2", "Bob Stone", "Human Resources", "bob@example.com")
+
+    assert search(client, "ANN") == ["E1"]
+    assert search(client, "  stone ") == ["E2"]
+    assert search(client, "bob@") == ["E2"]
+    assert search(client, "human r") == ["E2"]
+    assert search(client, "res") == ["E2"]
+    assert search(client, "zzz") == []
+    assert client.get("/employees/search", params={"q": "   "}).status_code == 400
+
+
+def test_search_ranks_by_field_then_key_then_creation(client, create_employee):
+    create_employee("E1", "Zed Ann", "Ops", "z1@example.com")
+    create_employee("E2", "Annabel Ray", "Ops", "z2@example.com")
+    create_employee("ANN", "Kim Cho", "Ops", "z3@example.com")
+    create_employee("E3", "Lee Park", "Annual Planning", "z4@example.com")
+    create_employee("E4", "Moe Dean", "Ops", "anne@example.com")
+    create_employee("E5", "Sam Ann", "Ops", "z5@example.com")
+
+    # employee_id, then name keys ("ann" before "annabel", ties by
+    # creation), then email, then department
+    assert search(client, "ann") == ["ANN", "E1", "E5", "E2", "E4", "E3"]
+    assert search(client, "ann", limit=3) == ["ANN", "E1", "E5"]
+
+
+def test_search_follows_updates_and_deletions(client, create_employee):
+    create_employee("E1", "Ann Lee", "Engineering")
+    create_employee("E2", "Bob Stone", "Engineering")
+
+    client.put("/employees/E2", json={"full_name": "Annika Stone", "department": "Sales"})
+    assert search(client, "ann") == ["E1", "E2"]
+    assert search(client, "eng") == ["E1"]
+    assert search(client, "sales") == ["E2"]
+
+    client.delete("/employees/E1")
+    assert search(client, "ann") == ["E2"]
+
+
+def test_search_limit_with_shared_keys(client, create_employee):
+    for index in range(30):
+        create_employee(f"E{index:02d}", f"Person {index}", "Engineering")
+
+    assert search(client, "engineering", limit=5) == [f"E{index:02d}" for index in range(5)]
+    assert len(search(client, "e", limit=500)) == 30
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { employeeAPI, attendanceAPI } from '../services/api';
 import { Loading, EmptyState, Button, Card, Badge, ErrorMessage } from '../components/Common';
 import { Modal, FormInput, FormSelect } from '../components/Modal';
@@ -20,12 +20,88 @@ export function Attendance() {
     status: 'Present',
   });
   const [formErrors, setFormErrors] = useState({});
+  // Whether the live event stream carries every worker's writes; this
+  // page's own writes are then applied from their events instead of refetching
+  const liveRef = useRef(false);
+  const attendanceRef = useRef(attendance);
+  attendanceRef.current = attendance;
 
   // Fetch employees and attendance
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Apply live changes from this and other sessions as they happen
+  useEffect(() => {
+    const source = attendanceAPI.stream();
+    source.onerror = () => { liveRef.current = false; };
+    const on = (type, handler) =>
+      source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+
+    // With per-worker events our own write may land on another worker
+    on('ready', ({ cluster_wide }) => { liveRef.current = cluster_wide; });
+
+    on('attendance.created', (record) => {
+      if (record.employee_id !== selectedEmployeeId) return;
+      if (attendanceRef.current.some((r) => r._id === record._id)) return;
+      setAttendance((records) =>
+        [record, ...records].sort((a, b) => b.date.localeCompare(a.date))
+      );
+      adjustSummary(record.status, 1);
+    });
+
+    on('attendance.updated', (record) => {
+      if (record.employee_id !== selectedEmployeeId) return;
+      const previous = attendanceRef.current.find((r) => r._id === record._id);
+      if (!previous) {
+        fetchSummary(selectedEmployeeId);
+        return;
+      }
+      setAttendance((records) => records.map((r) => (r._id === record._id ? record : r)));
+      if (previous.status !== record.status) {
+        adjustSummary(previous.status, -1);
+        adjustSummary(record.status, 1);
+      }
+    });
+
+    on('attendance.deleted', (removed) => {
+      const previous = attendanceRef.current.find((r) => r._id === removed._id);
+      if (!previous) return;
+      setAttendance((records) => records.filter((r) => r._id !== removed._id));
+      adjustSummary(previous.status, -1);
+    });
+
+    on('employee.created', (employee) => {
+      setEmployees((list) =>
+        list.some((e) => e._id === employee._id) ? list : [...list, employee]
+      );
+    });
+
+    on('employee.updated', (employee) => {
+      setEmployees((list) => list.map((e) => (e._id === employee._id ? employee : e)));
+    });
+
+    on('employee.deleted', ({ employee_id, department }) => {
+      const removed = (e) =>
+        (employee_id && e.employee_id === employee_id) || (department && e.department === department);
+      setEmployees((list) => list.filter((e) => !removed(e)));
+    });
+
+    // Events were missed (reconnect, slow client): reload everything
+    on('resync', () => {
+      fetchData();
+      if (selectedEmployeeId) {
+        fetchAttendanceForEmployee(selectedEmployeeId);
+        fetchSummary(selectedEmployeeId);
+      }
+    });
+
+    return () => {
+      liveRef.current = false;
+      source.close();
+    };
+  }, [selectedEmployeeId]);
+
   // Fetch summary when employee changes
   useEffect(() => {
     if (selectedEmployeeId) {
@@ -67,6 +143,23 @@ export function Attendance() {
     }
   };
 
+  // Move the summary counters by one record
+  const adjustSummary = (status, delta) => {
+    setSummary((current) => {
+      if (!current) return current;
+      const present = current.present_days + (status === 'Present' ? delta : 0);
+      const absent = current.absent_days + (status === 'Absent' ? delta : 0);
+      const total = present + absent;
+      return {
+        ...current,
+        total_records: total,
+        present_days: present,
+        absent_days: absent,
+        attendance_percentage: total > 0 ? Math.round((present / total) * 10000) / 100 : 0,
+      };
+    });
+  };
+
   // Validate form
   const validateForm = () => {
     const errors = {};
@@ -90,7 +183,7 @@ export function Attendance() {
       setIsModalOpen(false);
       setFormData({ employee_id: '', date: '', status: 'Present' });
       setFormErrors({});
-      if (selectedEmployeeId) {
+      if (selectedEmployeeId && !liveRef.current) {
         fetchAttendanceForEmployee(selectedEmployeeId);
         fetchSummary(selectedEmployeeId);
       }
@@ -107,7 +200,7 @@ export function Attendance() {
     try {
       await attendanceAPI.delete(recordId);
       toast.success('Record deleted successfully!');
-      if (selectedEmployeeId) {
+      if (selectedEmployeeId && !liveRef.current) {
         fetchAttendanceForEmployee(selectedEmployeeId);
         fetchSummary(selectedEmployeeId);
       }
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { employeeAPI, attendanceAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 import { Card, Loading } from '../components/Common';
 import { FiUsers, FiCalendar, FiCheckCircle, FiBarChart2 } from 'react-icons/fi';
 import { format } from 'date-fns';
@@ -21,24 +21,15 @@ export function Dashboard() {
   const fetchStats = async () => {
     setLoading(true);
     try {
-      const empResponse = await employeeAPI.getAll();
-      const attResponse = await attendanceAPI.getAll(0, 1000);
-
       const today = format(new Date(), 'yyyy-MM-dd');
-      const todayRecords = attResponse.data.filter(a => a.date === today);
-      const presentToday = todayRecords.filter(a => a.status === 'Present').length;
-
-      const totalAttendance = attResponse.data.length;
-      const presentCount = attResponse.data.filter((a) => a.status === 'Present').length;
-      const avgAttendance =
-        totalAttendance > 0 ? Math.round((presentCount / totalAttendance) * 100) : 0;
+      const { data } = await dashboardAPI.getStats(8, today);
 
       setStats({
-        totalEmployees: empResponse.data.length,
-        totalAttendance: totalAttendance,
-        avgAttendance: avgAttendance,
-        presentToday: presentToday,
-        recentAttendance: attResponse.data.slice(0, 8),
+        totalEmployees: data.total_employees,
+        totalAttendance: data.overall.total_records,
+        avgAttendance: Math.round(data.overall.attendance_percentage),
+        presentToday: data.day.present_days,
+        recentAttendance: data.recent_attendance,
       });
     } catch (err) {
       console.error('Failed to fetch stats:', err);
@@ -114,7 +105,7 @@ export function Dashboard() {
               <tbody>
                 {stats.recentAttendance.map((record) => (
                   <tr key={record._id} className="border-b hover:bg-gray-50">
-                    <td className="py-3 px-4 font-medium text-gray-800">{record.employee_id}</td>
+                    <td className="py-3 px-4 font-medium text-gray-800">{record.full_name || record.employee_id}</td>
                     <td className="py-3 px-4 text-gray-600">{format(new Date(record.date), 'MMM dd, yyyy')}</td>
                     <td className="py-3 px-4">
                       <span className={`px-3 py-1 rounded-full text-sm font-medium ${
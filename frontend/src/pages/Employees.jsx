@@ -2,7 +2,7 @@ import { useEffect, useState } from 'react';
 import { employeeAPI } from '../services/api';
 import { Loading, EmptyState, Button, Card, ErrorMessage } from '../components/Common';
 import { Modal, FormInput, FormSelect } from '../components/Modal';
-import { FiTrash2, FiPlus } from 'react-icons/fi';
+import { FiTrash2, FiPlus, FiSearch } from 'react-icons/fi';
 import { toast } from 'react-toastify';
 
 export function Employees() {
@@ -17,6 +17,8 @@ export function Employees() {
     department: '',
   });
   const [formErrors, setFormErrors] = useState({});
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
 
   // Fetch employees
   useEffect(() => {
@@ -38,6 +40,31 @@ export function Employees() {
     }
   };
 
+  // Search as the user types, once they pause; re-run when the list changes
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+
+    let stale = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await employeeAPI.search(query, 50);
+        if (!stale) setSearchResults(response.data);
+      } catch (err) {
+        if (!stale) toast.error(err.response?.data?.detail || 'Failed to search employees');
+      }
+    }, 250);
+    return () => {
+      stale = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery, employees]);
+
+  const visibleEmployees = searchResults ?? employees;
+
   // Validate form
   const validateForm = () => {
     const errors = {};
@@ -100,12 +127,30 @@ export function Employees() {
 
       {error && <ErrorMessage message={error} />}
 
-      {employees.length === 0 ? (
+      <div className="relative">
+        <FiSearch className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" />
+        <input
+          type="search"
+          value={searchQuery}
+          onChange={(e) => setSearchQuery(e.target.value)}
+          placeholder="Search by ID, name, email or department"
+          className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:border-blue-500 focus:ring-2 focus:ring-blue-200"
+        />
+      </div>
+
+      {visibleEmployees.length === 0 ? (
         <Card>
-          <EmptyState
-            title="No employees found"
-            description="Add your first employee to get started"
-          />
+          {searchResults ? (
+            <EmptyState
+              title="No matching employees"
+              description="Try a different ID, name, email or department"
+            />
+          ) : (
+            <EmptyState
+              title="No employees found"
+              description="Add your first employee to get started"
+            />
+          )}
         </Card>
       ) : (
         <Card>
@@ -121,7 +166,7 @@ export function Employees() {
                 </tr>
               </thead>
               <tbody>
-                {employees.map((emp) => (
+                {visibleEmployees.map((emp) => (
                   <tr key={emp._id} className="border-b hover:bg-gray-50 transition-colors">
                     <td className="py-3 px-4 font-semibold text-gray-800">{emp.employee_id}</td>
                     <td className="py-3 px-4 text-gray-800">{emp.full_name}</td>
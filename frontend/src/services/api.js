@@ -16,6 +16,10 @@ export const employeeAPI = {
   getAll: (skip = 0, limit = 100) => 
     api.get(`/employees?skip=${skip}&limit=${limit}`),
   
+  // Search employees by id, name, email or department prefix
+  search: (q, limit = 10) => 
+    api.get(`/employees/search?q=${encodeURIComponent(q)}&limit=${limit}`),
+  
   // Get single employee
   getById: (id) => 
     api.get(`/employees/${id}`),
@@ -66,6 +70,20 @@ export const attendanceAPI = {
   // Get specific record
   getRecord: (recordId) => 
     api.get(`/attendance/record/${recordId}`),
+  
+  // Live attendance and employee changes (Server-Sent Events)
+  stream: () => 
+    new EventSource(`${API_URL}/attendance/stream`),
+};
+
+// Dashboard APIs
+export const dashboardAPI = {
+  // Get dashboard stats (counts, today's attendance, recent records)
+  getStats: (recent = 8, day) => {
+    let url = `/dashboard/stats?recent=${recent}`;
+    if (day) url += `&day=${day}`;
+    return api.get(url);
+  },
 };
 
 export default api;